@@ -1,8 +1,32 @@
 import time
-import win32gui
-import csv
-from datetime import datetime
-import os
+from tracker.log_writer import UsageLogWriter
+from tracker.polling import AdaptivePoller
+from storage.app_normalizer import AppNormalizer, load_rules
+
+# Group commit: rows are written when this many are queued or every FLUSH_INTERVAL seconds
+FLUSH_INTERVAL = 30
+MAX_BATCH_SIZE = 50
+FSYNC_POLICY = "commit"  # "commit", "close" or "never"
+
+# "csv" for data/usage_log.csv, "binary" for the compact data/usage_log.bin format,
+# "sqlite" for the indexed data/usage_log.db database
+LOG_FORMAT = "csv"
+LOG_PATHS = {"csv": 'data/usage_log.csv', "binary": 'data/usage_log.bin', "sqlite": 'data/usage_log.db'}
+# None for a single log file, "day" or "month" for date partitions under data/usage_log/
+LOG_PARTITIONING = None
+# Log app names derived from window titles ("report.docx - Word" -> "Word"); the raw title
+# is kept in window_title. Rules can be extended in data/app_rules.json.
+NORMALIZE_APP_NAMES = True
+
+# Polling: 1s while windows change, backing off to MAX_CHECK_INTERVAL when stable and
+# IDLE_CHECK_INTERVAL when idle. A window shown for less than the current interval can
+# be missed, and a switch is timed to within half an interval, so keep both short.
+MIN_CHECK_INTERVAL = 1
+MAX_CHECK_INTERVAL = 2
+IDLE_THRESHOLD = 60
+IDLE_CHECK_INTERVAL = 5
+
+IGNORED_TITLES = ["", "Başlat", "Görev Yöneticisi"]
 
 
 def format_duration(seconds):
@@ -16,56 +40,79 @@ def format_duration(seconds):
         return f"{sec}s"
 
 
-def get_active_window_title():
-    window = win32gui.GetForegroundWindow()
-    title = win32gui.GetWindowText(window)
-    return title
+def _whole_seconds(active_time):
+    return max(1, round(active_time))
 
 
-def log_to_csv(window_title, duration):
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    file_exists = os.path.isfile('data/usage_log.csv')
-
-    with open('data/usage_log.csv', mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        if not file_exists or os.stat('data/usage_log.csv').st_size == 0:
-            writer.writerow(['app_name', 'duration', 'timestamp'])
-        writer.writerow([window_title, duration, now])
-
-
-def main():
+def track(source, writer, poller, clock=time.monotonic, sleep=time.sleep):
     last_title = None
-    active_time = 0
-    check_interval = 1
-    IGNORED_TITLES = ["", "Başlat", "Görev Yöneticisi"]
+    last_seen = None
+    active_time = 0.0
+    last_poll = clock()
 
     try:
         while True:
-            current_title = get_active_window_title()
-
-            if current_title in IGNORED_TITLES:
-                time.sleep(check_interval)
-                continue
-
-            if current_title == last_title:
-                active_time += check_interval
-            else:
+            current_title = source.get_active_window_title()
+            now = clock()
+            elapsed = now - last_poll
+            last_poll = now
+            changed = current_title != last_seen
+            # The time since the previous sample belongs to the window seen at that
+            # sample; if the window changed in between, each side gets half of it
+            previous_share = elapsed / 2 if changed else elapsed
+            if last_title and last_seen == last_title:
+                active_time += previous_share
+
+            if current_title is None:
+                break
+            last_seen = current_title
+
+            if current_title not in IGNORED_TITLES and current_title != last_title:
                 if last_title:
+                    duration = _whole_seconds(active_time)
                     print(
-                    f"'{last_title}' application was active for {active_time} seconds.")
-                    log_to_csv(last_title, active_time)
+                    f"'{last_title}' application was active for {duration} seconds.")
+                    writer.append(last_title, duration)
                 last_title = current_title
-                active_time = check_interval
-
-            time.sleep(check_interval)
+                active_time = 0.0
+            if changed and current_title == last_title:
+                active_time += elapsed - previous_share
 
+            if last_title:
+                writer.checkpoint(last_title, _whole_seconds(active_time))
+            sleep(poller.next_interval(changed, source.get_idle_seconds()))
 
     except KeyboardInterrupt:
-        if last_title:
-            print(
-            f"\nExiting program. Last active window: {last_title} ({format_duration(active_time)})")
-            log_to_csv(last_title, active_time)
-        print("Exited.")
+        if last_title and last_seen == last_title:
+            active_time += clock() - last_poll
+
+    if last_title:
+        duration = _whole_seconds(active_time)
+        print(
+        f"\nExiting program. Last active window: {last_title} ({format_duration(duration)})")
+        writer.append(last_title, duration)
+    print("Exited.")
+
+
+def main(source=None, clock=time.monotonic, sleep=time.sleep):
+    # A ScriptedWindowSource runs on its own clock: main(source, source.clock, source.sleep)
+    if source is None:
+        from tracker.window_source import Win32WindowSource
+        source = Win32WindowSource()
+
+    poller = AdaptivePoller(min_interval=MIN_CHECK_INTERVAL, max_interval=MAX_CHECK_INTERVAL,
+                            idle_threshold=IDLE_THRESHOLD, idle_interval=IDLE_CHECK_INTERVAL)
+    log_path = 'data/usage_log' if LOG_PARTITIONING else LOG_PATHS[LOG_FORMAT]
+    writer = UsageLogWriter(log_path, max_batch_size=MAX_BATCH_SIZE,
+                            flush_interval=FLUSH_INTERVAL, fsync_policy=FSYNC_POLICY,
+                            log_format=LOG_FORMAT, partitioning=LOG_PARTITIONING,
+                            normalizer=AppNormalizer(load_rules()) if NORMALIZE_APP_NAMES else None,
+                            clock=clock)
+    writer.open()
+    try:
+        track(source, writer, poller, clock=clock, sleep=sleep)
+    finally:
+        writer.close()
 
 if __name__ == "__main__":
     main()
@@ -1,31 +1,108 @@
+import argparse
+import time
+import tracemalloc
+from collections import Counter
 import pandas as pd
-import matplotlib.pyplot as plt
+from storage.usage_loader import iter_log_chunks, load_usage_data, log_size, resolve_usage_log
+from utils.memory import peak_rss_bytes
 
-# read CSV 
-df = pd.read_csv('data/usage_log.csv', header=0)
 
-df["duration"] = df["duration"].astype(int)
-total_duration = df['duration'].sum()
+def stream_app_usage(path=None, chunk_size=200_000):
+    # Per-app sums are merged chunk by chunk, so memory is bounded by the
+    # chunk size plus one counter per app rather than by the log size
+    totals = Counter()
+    rows = 0
+    for chunk in iter_log_chunks(path, chunk_size):
+        totals.update(chunk.groupby('app_name', observed=True)['duration'].sum().to_dict())
+        rows += len(chunk)
+    app_usage = pd.Series(dict(totals.most_common()), dtype="int64")
+    return app_usage, rows
 
-print(f"Total usage time: {total_duration // 60} minutes {total_duration % 60} seconds")
 
-# total duration as application
-app_usage = df.groupby('app_name')['duration'].sum().sort_values(ascending=False)
+def _peak_memory_mib():
+    peak = peak_rss_bytes()
+    if peak is None:
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    return peak / 2**20
 
 
-# top 5 most used apps
-app_usage_min = app_usage / 60
-top5_apps = app_usage_min.head(5)
+def write_report(app_usage, top, path):
+    total_duration = int(app_usage.sum())
+    lines = [f"Total usage time: {total_duration // 60} minutes {total_duration % 60} seconds", "",
+             f"Top {top} most used applications (minutes):"]
+    lines += [f"{app}\t{minutes:.1f}" for app, minutes in (app_usage.head(top) / 60).items()]
+    with open(path, mode="w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
 
-print("\nTop 5 most used applications:")
-print(top5_apps)
 
+def plot_top_apps(app_usage, top, plt):
+    top_apps = app_usage.head(top) / 60
+    plt.figure(figsize=(10,6))
+    top_apps.plot(kind='bar', color='skyblue')
+    plt.title(f'Top {top} Most Used Applications')
+    plt.xlabel('Application')
+    plt.ylabel('Total Time (minutes)')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
 
-plt.figure(figsize=(10,6))
-top5_apps.plot(kind='bar', color='skyblue')
-plt.title('Top 5 Most Used Applications')
-plt.xlabel('Application')
-plt.ylabel('Total Time (minutes)')
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.show()
+
+def run_streaming(args):
+    import matplotlib
+    matplotlib.use("Agg")  # headless: charts only go to files
+    import matplotlib.pyplot as plt
+
+    path = resolve_usage_log(args.path)
+    if peak_rss_bytes() is None:
+        # Windows: fall back to tracemalloc, which slows parsing down
+        tracemalloc.start()
+    started = time.perf_counter()
+    app_usage, rows = stream_app_usage(path, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    peak_mib = _peak_memory_mib()
+
+    write_report(app_usage, args.top, args.report)
+    plot_top_apps(app_usage, args.top, plt)
+    plt.savefig(args.chart)
+    print(f"✅ Report written to {args.report}, chart to {args.chart}")
+
+    size_mib = log_size(path) / 2**20
+    print(f"Read {rows:,} rows ({size_mib:.1f} MiB) in {elapsed:.2f}s: "
+          f"{rows / max(elapsed, 1e-9):,.0f} rows/s, {size_mib / max(elapsed, 1e-9):.1f} MiB/s")
+    print(f"Peak memory: {peak_mib:.1f} MiB")
+
+
+def run_interactive(args):
+    import matplotlib.pyplot as plt
+
+    # read usage log
+    df = load_usage_data(args.path, columns=["app_name", "duration"])
+
+    total_duration = int(df['duration'].sum())
+
+    print(f"Total usage time: {total_duration // 60} minutes {total_duration % 60} seconds")
+
+    # total duration as application
+    app_usage = df.groupby('app_name', observed=True)['duration'].sum().sort_values(ascending=False)
+
+    print(f"\nTop {args.top} most used applications:")
+    print(app_usage.head(args.top) / 60)
+
+    plot_top_apps(app_usage, args.top, plt)
+    plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize total usage time per application.")
+    parser.add_argument("path", nargs="?", default=None,
+                        help="CSV log, binary log or partition directory (default: the app's log)")
+    parser.add_argument("--top", type=int, default=5, help="number of applications to report")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the log in chunks with bounded memory and write the results to files")
+    parser.add_argument("--chunk-size", type=int, default=200_000, help="rows per chunk in --stream mode")
+    parser.add_argument("--report", default="usage_report.txt", help="report file written in --stream mode")
+    parser.add_argument("--chart", default="usage_top_apps.png", help="chart file written in --stream mode")
+    args = parser.parse_args()
+    if args.stream:
+        run_streaming(args)
+    else:
+        run_interactive(args)
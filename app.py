@@ -1,11 +1,14 @@
+import argparse
 import streamlit as st
 from datetime import timedelta
-from utils.data_loader import load_usage_data
-from utils.helpers import apply_filters
+from utils.data_loader import (load_page_data, get_date_bounds, get_dataset_info, get_aggregation_cache,
+                               get_live_usage, list_app_names, dataset_version)
+from utils.helpers import select_app, select_date_range
 from components.dashboard import render_dashboard
 from components.analytics import render_analytics
 from components.ai_chat import render_ai_chat
 from components.settings import render_settings
+from chatbot.model_registry import get_registry
 
 
 
@@ -16,10 +19,22 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# streamlit run app.py -- --warm-up-chatbot
+parser = argparse.ArgumentParser()
+parser.add_argument("--warm-up-chatbot", action="store_true",
+                    help="import the AI Chat stack in a background thread at startup")
+if parser.parse_known_args()[0].warm_up_chatbot:
+    from utils.instance import warm_up_chatbot
+    warm_up_chatbot()
 
-with open("styles.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
+@st.cache_resource
+def load_styles():
+    with open("styles.css") as f:
+        return f.read()
+
+
+st.markdown(f"<style>{load_styles()}</style>", unsafe_allow_html=True)
 
 st.markdown('''
     <div class="main-header">
@@ -31,58 +46,53 @@ st.markdown('''
 ''', unsafe_allow_html=True)
 
 
-df = load_usage_data()
-if df.empty:
+min_date, max_date = get_date_bounds()
+if min_date is None:
     st.error("⚠️ No usage data found. Make sure 'data/usage_log.csv' exists.")
     st.stop()
 
 # Sidebar 
-filtered_df, selected_app = apply_filters(df)
+date_range = select_date_range(min_date, max_date)
+selected_app = select_app(list_app_names(*date_range))
 
 # Session state 
 if "current_page" not in st.session_state:
     st.session_state.current_page = "dashboard"
 
-# Navigation bar
-st.markdown("---")
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    if st.button("📊 Dashboard", key="nav_dashboard", 
-                use_container_width=True,
-                type="primary" if st.session_state.current_page == "dashboard" else "secondary"):
-        st.session_state.current_page = "dashboard"
-        st.rerun()
-
-with col2:
-    if st.button("📈 Analytics", key="nav_analytics", 
-                use_container_width=True,
-                type="primary" if st.session_state.current_page == "analytics" else "secondary"):
-        st.session_state.current_page = "analytics"
-        st.rerun()
-
-with col3:
-    if st.button("🤖 AI Chat", key="nav_ai_chat", 
-                use_container_width=True,
-                type="primary" if st.session_state.current_page == "ai_chat" else "secondary"):
-        st.session_state.current_page = "ai_chat"
-        st.rerun()
-
-with col4:
-    if st.button("⚙️ Settings", key="nav_settings", 
-                use_container_width=True,
-                type="primary" if st.session_state.current_page == "settings" else "secondary"):
-        st.session_state.current_page = "settings"
-        st.rerun()
-
-st.markdown("---")
-
-# Page content
-if st.session_state.current_page == "dashboard":
-    render_dashboard(filtered_df)
-elif st.session_state.current_page == "analytics":
-    render_analytics(filtered_df)
-elif st.session_state.current_page == "ai_chat":
-    render_ai_chat()
-elif st.session_state.current_page == "settings":
-    render_settings(df)
\ No newline at end of file
+PAGES = {
+    "dashboard": "📊 Dashboard",
+    "analytics": "📈 Analytics",
+    "ai_chat": "🤖 AI Chat",
+    "settings": "⚙️ Settings",
+}
+
+
+def set_page(page):
+    st.session_state.current_page = page
+
+
+# Navigation and page content rerun on their own: switching pages or using a
+# page's widgets skips the header, sidebar and data loading above
+@st.fragment
+def render_page(date_range, selected_app, version):
+    # Navigation bar
+    st.markdown("---")
+    for col, (page, label) in zip(st.columns(len(PAGES)), PAGES.items()):
+        with col:
+            st.button(label, key=f"nav_{page}", use_container_width=True, on_click=set_page, args=(page,),
+                      type="primary" if st.session_state.current_page == page else "secondary")
+    st.markdown("---")
+
+    # Page content
+    if st.session_state.current_page == "dashboard":
+        render_dashboard(load_page_data(*date_range, selected_app, version), live_usage=get_live_usage())
+    elif st.session_state.current_page == "analytics":
+        render_analytics(load_page_data(*date_range, selected_app, version))
+    elif st.session_state.current_page == "ai_chat":
+        render_ai_chat()
+    elif st.session_state.current_page == "settings":
+        render_settings(get_dataset_info(), date_range, get_aggregation_cache().stats(),
+                        get_registry().memory_report())
+
+
+render_page(date_range, selected_app, dataset_version())
@@ -0,0 +1,85 @@
+import argparse
+import time
+import pandas as pd
+from benchmarks.synthetic_log import make_usage_log
+from chatbot.document_processor import DocumentProcessor
+from storage.rollups import UsageRollups
+from storage.timestamps import TIMESTAMP_FORMAT
+from storage.usage_loader import add_derived_columns
+
+
+# The row-by-row builder DocumentProcessor replaced, kept here as the baseline
+def legacy_documents(rollups):
+    from langchain.schema import Document
+    documents = []
+    for _, row in rollups.day_app.iterrows():
+        minutes = row['duration'] // 60
+        seconds = row['duration'] % 60
+        content = f"Date: {row['date']}, App: {row['app_name']}, Duration: {minutes} minutes {seconds} seconds"
+        documents.append(Document(page_content=content, metadata={
+            "date": str(row['date']), "app_name": row['app_name'], "duration": row['duration'],
+            "type": "daily_usage"}))
+    for _, row in rollups.day_hour.iterrows():
+        if row['duration'] > 300:
+            content = f"Date: {row['date']}, Hour: {row['hour']}:00, Total Activity: {row['duration']//60} minutes"
+            documents.append(Document(page_content=content, metadata={
+                "date": str(row['date']), "hour": row['hour'], "duration": row['duration'],
+                "type": "hourly_activity"}))
+    app_totals = rollups.app_totals.rename(columns={'duration': 'sum', 'sessions': 'count'})
+    for _, row in app_totals.iterrows():
+        total_minutes = row['sum'] // 60
+        avg_session = (row['sum'] / row['count']) // 60
+        content = (f"App: {row['app_name']}, Total Usage: {total_minutes} minutes, "
+                   f"Average Session: {avg_session} minutes, Used {row['count']} times")
+        documents.append(Document(page_content=content, metadata={
+            "app_name": row['app_name'], "total_duration": row['sum'], "session_count": row['count'],
+            "type": "app_summary"}))
+    return documents
+
+
+def batched_documents(rollups, batch_size):
+    return [doc for batch in DocumentProcessor.iter_documents(rollups, batch_size) for doc in batch]
+
+
+def _time(function, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# Run from the repository root: python -m benchmarks.bench_documents [--rows 5000000]
+def main():
+    parser = argparse.ArgumentParser(description="Compare the iterrows document builder with DocumentProcessor.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--documents-per-app", type=int, default=20,
+                        help="distinct window titles per app (1 = normalized app names)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_usage_log(args.rows, args.days, args.documents_per_app)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=TIMESTAMP_FORMAT)
+    rollups = UsageRollups.from_rows(add_derived_columns(df))
+    print(f"{args.rows} rows -> {len(rollups.day_app)} day x app, {len(rollups.day_hour)} day x hour, "
+          f"{len(rollups.app_totals)} app rows")
+
+    legacy_time, legacy = _time(legacy_documents, rollups, repeat=args.repeat)
+    vectorized_time, vectorized = _time(DocumentProcessor.create_documents, None, rollups, repeat=args.repeat)
+    batched_time, batched = _time(batched_documents, rollups, args.batch_size, repeat=args.repeat)
+
+    for name, seconds in (("iterrows (legacy)", legacy_time), ("DocumentProcessor", vectorized_time),
+                          (f"DocumentProcessor, batches of {args.batch_size}", batched_time)):
+        print(f"{name:<40}{seconds:>8.2f} s  {len(legacy) / seconds:>12,.0f} docs/s  "
+              f"{legacy_time / seconds:>6.1f}x")
+
+    same = all(new.page_content == old.page_content and new.metadata == old.metadata
+               for new, old in zip(vectorized, legacy)) and len(vectorized) == len(legacy) == len(batched)
+    print("✅ Same documents" if same else "❌ Documents differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import pandas as pd
+from benchmarks.synthetic_log import make_usage_log
+from chatbot.document_processor import DocumentProcessor
+from chatbot.embedding_pipeline import EMBED_BATCH_SIZE, EMBED_WORKERS, ENCODE_BATCH_SIZE, EmbeddingPipeline
+from chatbot.model_registry import get_registry
+from chatbot.vector_store_manager import document_id
+from storage.rollups import UsageRollups
+from storage.timestamps import TIMESTAMP_FORMAT
+from storage.usage_loader import add_derived_columns
+
+
+# Run from the repository root: python -m benchmarks.bench_embedding [--workers 1] [--batch-size 256]
+# Needs sentence-transformers and chromadb; the embedding cache is not used, so every document is encoded
+def main():
+    parser = argparse.ArgumentParser(description="Embed a synthetic year of chatbot documents into an "
+                                                 "in-memory Chroma collection and report docs/sec and peak memory.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--documents-per-app", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="documents per embed/write step")
+    parser.add_argument("--encode-batch-size", type=int, default=ENCODE_BATCH_SIZE, help="texts per forward pass")
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS, help="CPU processes (1 = in-process)")
+    parser.add_argument("--pool-min-texts", type=int, default=0,
+                        help="texts embedded in-process before the worker pool starts")
+    args = parser.parse_args()
+
+    import chromadb
+    df = make_usage_log(args.rows, args.days, args.documents_per_app)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=TIMESTAMP_FORMAT)
+    rollups = UsageRollups.from_rows(add_derived_columns(df))
+    del df
+
+    collection = chromadb.EphemeralClient().create_collection("bench_embedding")
+    model = get_registry().embedding_model()
+
+    def write(batch, embeddings):
+        collection.add(ids=[doc_id for doc_id, _ in batch], embeddings=embeddings.tolist(),
+                       documents=[doc.page_content for _, doc in batch])
+
+    documents = ((document_id(doc), doc) for batch in DocumentProcessor.iter_documents(rollups, args.batch_size)
+                 for doc in batch)
+    pipeline = EmbeddingPipeline(lambda: model, None, batch_size=args.batch_size, workers=args.workers,
+                                 encode_batch_size=args.encode_batch_size, pool_min_texts=args.pool_min_texts)
+    stats = pipeline.run(documents, write)
+
+    print(f"{stats['documents']} documents in {stats['seconds']:.1f} s: {stats['docs_per_second']:.0f} docs/s "
+          f"({args.workers} worker(s), batches of {args.batch_size})")
+    if stats["peak_rss_bytes"]:
+        print(f"Peak memory: {stats['peak_rss_bytes'] / 2**20:.0f} MB"
+              + (f", largest worker {stats['worker_peak_rss_bytes'] / 2**20:.0f} MB"
+                 if stats["worker_peak_rss_bytes"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import time
+import pandas as pd
+from benchmarks.synthetic_log import make_usage_log
+from storage.time_index import UsageIndex
+from storage.timestamps import TIMESTAMP_FORMAT
+from storage.usage_loader import add_derived_columns
+
+
+# The sidebar filtering that UsageIndex replaced, kept here as the baseline
+def legacy_filters(df, start_date, end_date, app_name):
+    filtered_df = df[(df["date"] >= start_date) & (df["date"] <= end_date)]
+    app_names = sorted(filtered_df["app_name"].unique().tolist())
+    return app_names, filtered_df[filtered_df["app_name"] == app_name]
+
+
+def indexed_filters(index, start_date, end_date, app_name):
+    return index.app_names(start_date, end_date), index.select(start_date, end_date, app_name)
+
+
+def _time(function, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# Run from the repository root: python -m benchmarks.bench_filters [--rows 20000000]
+def main():
+    parser = argparse.ArgumentParser(description="Compare mask-based sidebar filters with the sorted time index.")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--documents-per-app", type=int, default=200,
+                        help="distinct window titles per app (1 = normalized app names)")
+    args = parser.parse_args()
+
+    df = make_usage_log(args.rows, args.days, args.documents_per_app)
+    df["app_name"] = df["app_name"].astype("category")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=TIMESTAMP_FORMAT)
+    df = add_derived_columns(df)
+
+    build, index = _time(UsageIndex, df, repeat=1)
+    end_date = df["date"].iloc[-1]
+    start_date = end_date - pd.Timedelta(days=7)
+    app_name = df["app_name"].iloc[-1]
+    legacy, (legacy_apps, legacy_rows) = _time(legacy_filters, df, start_date, end_date, app_name)
+    indexed, (apps, rows) = _time(indexed_filters, index, start_date, end_date, app_name)
+    assert apps == legacy_apps and rows.index.equals(legacy_rows.index)
+
+    print(f"{args.rows:,} rows, last 7 days, one app ({len(rows):,} rows, {len(apps)} apps in range)")
+    print(f"{'masks + unique()':<24}{legacy * 1000:>10.2f} ms")
+    print(f"{'UsageIndex':<24}{indexed * 1000:>10.2f} ms  (built once in {build:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
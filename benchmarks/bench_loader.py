@@ -0,0 +1,68 @@
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+from benchmarks.synthetic_log import write_usage_csv
+from storage import usage_loader
+from storage.binary_log import convert_csv_to_binary
+
+
+# The loaders that storage.usage_loader replaced, kept here as the baseline
+def legacy_app_loader(path):
+    df = pd.read_csv(path)
+    df["duration"] = df["duration"].astype(int)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df["date"] = df["timestamp"].dt.date
+    df["hour"] = df["timestamp"].dt.hour
+    return df
+
+
+def legacy_data_processor_loader(path):
+    df = pd.read_csv(path, header=0)
+    df["duration"] = pd.to_numeric(df["duration"], errors="coerce")
+    df = df[df["duration"].notnull()].copy()
+    df["duration"] = df["duration"].fillna(0).astype(int)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df['date'] = df["timestamp"].apply(lambda x: x.date() if not pd.isnull(x) else x)
+    df['hour'] = df["timestamp"].apply(lambda x: x.hour if not pd.isnull(x) else x)
+    return df
+
+
+def _time(loader, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = loader(path)
+        best = min(best, time.perf_counter() - start)
+    return best, df.memory_usage(deep=True).sum() / 2**20
+
+
+# Run from the repository root: python -m benchmarks.bench_loader [--rows 2000000]
+def main():
+    parser = argparse.ArgumentParser(description="Compare the shared usage loader with the legacy loaders.")
+    parser.add_argument("--csv", help="existing usage log (default: synthetic data)")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.csv or write_usage_csv(os.path.join(tmp, "usage_log.csv"), rows=args.rows)
+        print(f"Log: {path} ({os.path.getsize(path) / 2**20:.1f} MiB)")
+        results = [
+            ("utils.data_loader (legacy)", *_time(legacy_app_loader, path, args.repeat)),
+            ("DataProcessor (legacy)", *_time(legacy_data_processor_loader, path, args.repeat)),
+            ("storage.usage_loader", *_time(usage_loader.load_usage_data, path, args.repeat)),
+        ]
+        bin_path = os.path.join(tmp, "usage_log.bin")
+        convert_csv_to_binary(path, bin_path)
+        results.append(("storage.usage_loader (binary)", *_time(usage_loader.load_usage_data, bin_path, args.repeat)))
+
+    new_time = results[2][1]
+    print(f"{'loader':30}{'seconds':>10}{'MiB':>10}{'relative':>10}")
+    for name, seconds, memory in results:
+        print(f"{name:30}{seconds:>10.2f}{memory:>10.1f}{seconds / new_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import time
+import pandas as pd
+from benchmarks.synthetic_log import make_usage_log
+from storage.app_normalizer import AppNormalizer, load_rules
+from storage.timestamps import TIMESTAMP_FORMAT
+
+
+def _group_counts(df):
+    # Mirrors the groupings in the dashboard and UsageDataRAG._create_documents
+    start = time.perf_counter()
+    apps = df.groupby("app_name")["duration"].sum()
+    daily = df.groupby(["date", "app_name"])["duration"].sum()
+    elapsed = time.perf_counter() - start
+    return len(apps), len(daily), elapsed
+
+
+# Run from the repository root: python -m benchmarks.bench_normalizer [--csv data/usage_log.csv]
+def main():
+    parser = argparse.ArgumentParser(description="Measure app_name cardinality before/after title normalization.")
+    parser.add_argument("--csv", help="existing usage log (default: synthetic data)")
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv) if args.csv else make_usage_log(args.rows)
+    if "window_title" in df:
+        df["app_name"] = df["window_title"]
+    df["date"] = pd.to_datetime(df["timestamp"], format=TIMESTAMP_FORMAT).dt.date
+
+    raw_apps, raw_daily, raw_time = _group_counts(df)
+
+    normalizer = AppNormalizer(load_rules())
+    start = time.perf_counter()
+    df["app_name"] = normalizer.normalize_series(df["app_name"].astype(str))
+    normalize_time = time.perf_counter() - start
+    apps, daily, grouped_time = _group_counts(df)
+
+    print(f"Rows: {len(df):,}  (normalized in {normalize_time:.3f}s, "
+          f"{normalizer.normalize.cache_info().currsize} distinct titles)")
+    print(f"{'':24}{'raw titles':>12}{'normalized':>12}")
+    print(f"{'app_name groups':24}{raw_apps:>12,}{apps:>12,}")
+    print(f"{'app_summary documents':24}{raw_apps:>12,}{apps:>12,}")
+    print(f"{'daily_usage documents':24}{raw_daily:>12,}{daily:>12,}")
+    print(f"{'groupby time (s)':24}{raw_time:>12.3f}{grouped_time:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from benchmarks.synthetic_log import write_usage_csv
+from storage.sqlite_store import migrate_log
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["dashboard", "analytics", "ai_chat", "settings"]
+
+
+def _rerun_time(at, page, repeat):
+    at.session_state["current_page"] = page
+    at.run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return statistics.median(times)
+
+
+# Run from the repository root: python -m benchmarks.bench_rerun [--rows 2000000] [--sqlite]
+def main():
+    parser = argparse.ArgumentParser(description="Time full-script reruns of the Streamlit app per page.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sqlite", action="store_true", help="serve the log from data/usage_log.db")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        csv_path = write_usage_csv(os.path.join(tmp, "data", "usage_log.csv"), rows=args.rows)
+        shutil.copy(os.path.join(REPO_ROOT, "styles.css"), tmp)
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            if args.sqlite:
+                migrate_log(csv_path, os.path.join("data", "usage_log.db"))
+            at = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=300)
+            at.run()
+            # An unknown page renders only the header, sidebar and navigation bar
+            outside = _rerun_time(at, "", args.repeat)
+            results = [(page, _rerun_time(at, page, args.repeat)) for page in PAGES]
+        finally:
+            os.chdir(cwd)
+
+    # AppTest always reruns the whole script, so a page fragment's own rerun is
+    # estimated as the full rerun minus the part outside the fragment
+    print(f"{args.rows:,} rows ({'SQLite' if args.sqlite else 'CSV'}), outside the page fragment: "
+          f"{outside * 1000:.1f} ms")
+    print(f"{'page':<12}{'full rerun':>14}{'fragment rerun':>18}")
+    for page, full in results:
+        print(f"{page:<12}{full * 1000:>11.1f} ms{max(full - outside, 0) * 1000:>15.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = "bench_startup: first run"
+# Modules the Dashboard page must never load
+FORBIDDEN = ("torch", "sentence_transformers", "chromadb", "langchain", "langchain_core", "langchain_ollama",
+             "transformers")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def child(data_dir):
+    # Runs under -X importtime: everything imported after MARKER is the app's own cold start
+    from streamlit.testing.v1 import AppTest
+    os.chdir(data_dir)
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=300)
+    print(MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    loaded = sorted(name for name in sys.modules if name.split(".")[0] in FORBIDDEN)
+    print(json.dumps({"first_run": elapsed, "forbidden": loaded}))
+
+
+def parse_importtime(stderr):
+    """Top-level imports after MARKER as (name, cumulative seconds)."""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            imports.append((match.group(4), int(match.group(2)) / 1e6))
+    return imports
+
+
+# Run from the repository root: python -m benchmarks.bench_startup [--budget-ms 2000]
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start the Dashboard page under -X importtime "
+                                                 "and check it against a time budget.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--budget-ms", type=float, default=2000,
+                        help="maximum first-run time of the Dashboard page, imports included")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    from benchmarks.synthetic_log import write_usage_csv
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        write_usage_csv(os.path.join(tmp, "data", "usage_log.csv"), rows=args.rows)
+        shutil.copy(os.path.join(REPO_ROOT, "styles.css"), tmp)
+        process = subprocess.run([sys.executable, "-X", "importtime", "-m", "benchmarks.bench_startup",
+                                  "--child", tmp], cwd=REPO_ROOT, capture_output=True, text=True)
+    if process.returncode:
+        print(process.stderr[-2000:])
+        sys.exit(process.returncode)
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(process.stderr)
+
+    print(f"Dashboard cold start: {result['first_run'] * 1000:.0f} ms "
+          f"(budget {args.budget_ms:.0f} ms), {sum(t for _, t in imports) * 1000:.0f} ms of it imports")
+    for name, seconds in sorted(imports, key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40}{seconds * 1000:>8.1f} ms")
+
+    failed = False
+    if result["forbidden"]:
+        print(f"❌ Chatbot modules loaded by the Dashboard: {', '.join(result['forbidden'])}")
+        failed = True
+    if result["first_run"] * 1000 > args.budget_ms:
+        print("❌ Over the cold-start budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from storage.timestamps import TIMESTAMP_FORMAT
+
+APPS = ["Word", "Excel", "Google Chrome", "Visual Studio Code", "Outlook", "Slack",
+        "Spotify", "File Explorer", "Mozilla Firefox", "Notepad++"]
+
+
+def make_usage_log(rows=100_000, days=365, documents_per_app=200, seed=0):
+    """Raw tracker-style rows: window titles as app_name, string timestamps."""
+    rng = np.random.default_rng(seed)
+    apps = rng.integers(0, len(APPS), rows)
+    documents = rng.integers(0, documents_per_app, rows)
+    titles = np.array([f"document_{d}.txt - {app}" for app in APPS for d in range(documents_per_app)], dtype=object)
+    start = pd.Timestamp.now().normalize() - pd.Timedelta(days=days)
+    offsets = np.sort(rng.integers(0, days * 86400, rows))
+    return pd.DataFrame({
+        "app_name": titles[apps * documents_per_app + documents],
+        "duration": rng.integers(1, 900, rows),
+        "timestamp": (start + pd.to_timedelta(offsets, unit="s")).strftime(TIMESTAMP_FORMAT),
+    })
+
+
+def write_usage_csv(path, rows=100_000, days=365, seed=0):
+    make_usage_log(rows, days, seed=seed).to_csv(path, index=False)
+    return path
@@ -0,0 +1,95 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+MAX_ENTRIES = 256
+# Answers about "today" or "this week" go stale even when no new rows arrive
+TTL_SECONDS = 600
+# Cosine similarity above which a general question reuses an earlier answer
+SIMILARITY_THRESHOLD = 0.92
+
+
+def normalize_question(question):
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+
+class AnswerCache:
+    """Answers by normalized question, for one dataset version at a time.
+
+    ``get`` finds answers to the same question; ``get_similar`` finds answers
+    to questions whose embeddings are at least ``threshold`` cosine-similar.
+    Entries expire after ``ttl`` seconds, the least recently used are
+    evicted beyond ``max_entries``, and a new version drops every entry.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, threshold=SIMILARITY_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl
+        for key in [key for key, entry in self._entries.items() if entry["time"] < deadline]:
+            del self._entries[key]
+
+    def get(self, question, version):
+        key = normalize_question(question)
+        with self._lock:
+            self._check_version(version)
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["answer"]
+
+    def get_similar(self, embedding, version):
+        with self._lock:
+            self._check_version(version)
+            self._expire()
+            keys = [key for key, entry in self._entries.items() if entry["embedding"] is not None]
+            if not keys:
+                return None
+            matrix = np.stack([self._entries[key]["embedding"] for key in keys])
+            similarities = matrix @ _unit(embedding)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            self._entries.move_to_end(keys[best])
+            self.semantic_hits += 1
+            return self._entries[keys[best]]["answer"]
+
+    def put(self, question, version, answer, embedding=None):
+        key = normalize_question(question)
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = {"answer": answer, "time": time.monotonic(),
+                                  "embedding": None if embedding is None else _unit(embedding)}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "semantic_hits": self.semantic_hits,
+                "misses": self.misses}
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
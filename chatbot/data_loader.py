@@ -1,14 +1,4 @@
-import pandas as pd
+from storage import usage_loader
 
-def load_usage_data(csv_path="data/usage_log.csv"):
-    try:
-        df = pd.read_csv(csv_path)
-        df["duration"] = pd.to_numeric(df["duration"], errors="coerce").fillna(0).astype(int)
-        df["timestamp"] = pd.to_datetime(df["timestamp"], errors='coerce')
-        df = df.dropna(subset=["timestamp"])
-        df["date"] = df["timestamp"].dt.date
-        df["hour"] = df["timestamp"].dt.hour
-        return df
-    except Exception as e:
-        print(f"Error loading data: {e}")
-        return pd.DataFrame()
+def load_usage_data(csv_path="data/usage_log.csv", start_date=None, end_date=None):
+    return usage_loader.load_usage_data(csv_path, start_date, end_date)
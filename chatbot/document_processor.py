@@ -1,55 +1,74 @@
+from __future__ import annotations
+
 import pandas as pd
-from typing import List
-from langchain.schema import Document
+from typing import TYPE_CHECKING, Iterator, List, Optional
+from storage.rollups import UsageRollups
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
+# Day x hour totals of at most this many seconds get no document
+MIN_HOURLY_DURATION = 300
+
+
+# Each builder formats a rollup table column by column and returns the
+# document texts and metadata as plain lists
+def _daily_usage(day_app):
+    dates = day_app["date"].astype(str)
+    apps = day_app["app_name"].astype(str)
+    duration = day_app["duration"]
+    content = ("Date: " + dates + ", App: " + apps + ", Duration: " + (duration // 60).astype(str)
+               + " minutes " + (duration % 60).astype(str) + " seconds")
+    metadata = [{"date": date, "app_name": app, "duration": seconds, "type": "daily_usage"}
+                for date, app, seconds in zip(dates.tolist(), apps.tolist(), duration.tolist())]
+    return content.tolist(), metadata
+
+
+def _hourly_activity(day_hour):
+    dates = day_hour["date"].astype(str)
+    hours = day_hour["hour"].astype("int64")
+    duration = day_hour["duration"]
+    content = ("Date: " + dates + ", Hour: " + hours.astype(str) + ":00, Total Activity: "
+               + (duration // 60).astype(str) + " minutes")
+    metadata = [{"date": date, "hour": hour, "duration": seconds, "type": "hourly_activity"}
+                for date, hour, seconds in zip(dates.tolist(), hours.tolist(), duration.tolist())]
+    return content.tolist(), metadata
+
+
+def _app_summary(app_totals):
+    apps = app_totals["app_name"].astype(str)
+    total = app_totals["duration"]
+    count = app_totals["sessions"]
+    average = (total / count.where(count > 0)).fillna(0) // 60
+    content = ("App: " + apps + ", Total Usage: " + (total // 60).astype(str) + " minutes, Average Session: "
+               + average.astype(str) + " minutes, Used " + count.astype(str) + " times")
+    metadata = [{"app_name": app, "total_duration": seconds, "session_count": sessions, "type": "app_summary"}
+                for app, seconds, sessions in zip(apps.tolist(), total.tolist(), count.tolist())]
+    return content.tolist(), metadata
+
 
 class DocumentProcessor:
     @staticmethod
-    def create_documents(df: pd.DataFrame) -> List[Document]:
-        documents = []
-
-        daily_stats = df.groupby(['date', 'app_name'])['duration'].sum().reset_index()
-        for _, row in daily_stats.iterrows():
-            minutes = row['duration'] // 60
-            seconds = row['duration'] % 60
-            content = f"Date: {row['date']}, App: {row['app_name']}, Duration: {minutes} minutes {seconds} seconds"
-            documents.append(Document(
-                page_content=content,
-                metadata={
-                    "date": str(row['date']),
-                    "app_name": row['app_name'],
-                    "duration": row['duration'],
-                    "type": "daily_usage"
-                }
-            ))
-
-        hourly_stats = df.groupby(['date', 'hour'])['duration'].sum().reset_index()
-        for _, row in hourly_stats.iterrows():
-            if row['duration'] > 300:  # Only if usage > 5 mins
-                content = f"Date: {row['date']}, Hour: {row['hour']}:00, Total Activity: {row['duration'] // 60} minutes"
-                documents.append(Document(
-                    page_content=content,
-                    metadata={
-                        "date": str(row['date']),
-                        "hour": row['hour'],
-                        "duration": row['duration'],
-                        "type": "hourly_activity"
-                    }
-                ))
-
-        app_totals = df.groupby('app_name')['duration'].agg(['sum', 'count']).reset_index()
-        for _, row in app_totals.iterrows():
-            total_minutes = row['sum'] // 60
-            avg_session = (row['sum'] / row['count']) // 60 if row['count'] > 0 else 0
-            content = f"App: {row['app_name']}, Total Usage: {total_minutes} minutes, Average Session: {avg_session} minutes, Used {row['count']} times"
-            documents.append(Document(
-                page_content=content,
-                metadata={
-                    "app_name": row['app_name'],
-                    "total_duration": row['sum'],
-                    "session_count": row['count'],
-                    "type": "app_summary"
-                }
-            ))
-
-        print(f"✅ {len(documents)} documents created.")
-        return documents
+    def iter_documents(rollups: UsageRollups, batch_size: Optional[int] = None) -> Iterator[List[Document]]:
+        """Yield the chatbot documents for ``rollups`` in lists of at most ``batch_size``.
+
+        Batches are built on demand, so an embedder consuming them never holds
+        more than one batch of ``Document`` objects; without ``batch_size``
+        each document type comes as one list.
+        """
+        from langchain.schema import Document
+
+        day_hour = rollups.day_hour[rollups.day_hour["duration"] > MIN_HOURLY_DURATION]
+        for table, build in ((rollups.day_app, _daily_usage), (day_hour, _hourly_activity),
+                             (rollups.app_totals, _app_summary)):
+            step = batch_size or max(len(table), 1)
+            for start in range(0, len(table), step):
+                contents, metadatas = build(table.iloc[start:start + step])
+                yield [Document(page_content=content, metadata=metadata)
+                       for content, metadata in zip(contents, metadatas)]
+
+    @staticmethod
+    def create_documents(df: Optional[pd.DataFrame] = None, rollups: Optional[UsageRollups] = None) -> List[Document]:
+        if rollups is None:
+            rollups = UsageRollups.from_rows(df)
+        return [doc for batch in DocumentProcessor.iter_documents(rollups) for doc in batch]
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+
+CACHE_VERSION = 1
+EMBEDDING_CACHE_DIR = "./data/embedding_cache"
+# 100k vectors of all-MiniLM-L6-v2 (384 floats) take about 150 MB on disk
+MAX_ENTRIES = 100_000
+
+
+KEY_BYTES = 20
+
+
+def _text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Embeddings of texts one model has already encoded, kept on disk.
+
+    Vectors are rows of a float32 matrix memory-mapped from ``<model>.f32``;
+    ``<model>.index`` maps the SHA-1 of each text to its row, least recently
+    used first. Once ``max_entries`` vectors are stored, the least recently
+    used rows are overwritten. New entries reach the index file on ``save``;
+    until then an overwritten row may still be indexed under its old text,
+    which is why each row's SHA-1 is also kept in ``<model>.keys`` and
+    checked on lookup.
+    """
+
+    def __init__(self, model_name, directory=EMBEDDING_CACHE_DIR, max_entries=MAX_ENTRIES):
+        name = re.sub(r"[^\w.-]", "_", model_name)
+        self.model_name = model_name
+        self.matrix_path = os.path.join(directory, f"{name}.f32")
+        self.keys_path = os.path.join(directory, f"{name}.keys")
+        self.index_path = os.path.join(directory, f"{name}.index")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()
+        self._free = []
+        self._next_row = 0
+        self._dim = None
+        self._matrix = None
+        self._keys = None
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, mode="rb") as file:
+                stored = pickle.load(file)
+            capacity = min(os.path.getsize(self.matrix_path) // (4 * stored["dim"]),
+                           os.path.getsize(self.keys_path) // KEY_BYTES)
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, ZeroDivisionError):
+            return
+        rows = stored["rows"]
+        if stored.get("version") != CACHE_VERSION or any(row >= capacity for row in rows.values()):
+            return
+        self._rows, self._dim = rows, stored["dim"]
+        self._next_row = max(rows.values(), default=-1) + 1
+        while len(self._rows) > self.max_entries:
+            self._rows.popitem(last=False)
+        used = set(self._rows.values())
+        self._free = [row for row in range(self._next_row) if row not in used]
+        if capacity:
+            self._map(capacity)
+
+    def _map(self, capacity):
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+        self._keys = np.memmap(self.keys_path, dtype=np.uint8, mode="r+", shape=(capacity, KEY_BYTES))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _grow(self, rows):
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if rows <= capacity:
+            return
+        capacity = min(max(rows, capacity * 2, 1024), max(self.max_entries, rows))
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._keys.flush()
+        os.makedirs(os.path.dirname(self.matrix_path) or ".", exist_ok=True)
+        for path, row_bytes in ((self.matrix_path, self._dim * 4), (self.keys_path, KEY_BYTES)):
+            with open(path, mode="ab") as file:
+                file.truncate(capacity * row_bytes)
+        self._map(capacity)
+
+    def _allocate(self):
+        if len(self._rows) >= self.max_entries:
+            return self._rows.popitem(last=False)[1]
+        if self._free:
+            return self._free.pop()
+        self._next_row += 1
+        return self._next_row - 1
+
+    def encode(self, texts, encode):
+        """Embeddings of ``texts`` as a float32 matrix, one row per text.
+
+        ``encode`` (e.g. a SentenceTransformer's) is only called, once, with
+        the distinct texts that are not cached yet.
+        """
+        keys = [_text_key(text) for text in texts]
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None or key in found:
+                    continue
+                if self._keys[row].tobytes() != key:
+                    del self._rows[key]
+                    continue
+                self._rows.move_to_end(key)
+                found[key] = np.array(self._matrix[row])
+            self.hits += sum(key in found for key in keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            vectors = np.asarray(encode(list(missing.values())), dtype=np.float32).reshape(len(missing), -1)
+            found.update(zip(missing, vectors))
+            self._store(missing, vectors)
+        if not keys:
+            return np.empty((0, self._dim or 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def _store(self, keys, vectors):
+        with self._lock:
+            self.misses += len(keys)
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            if vectors.shape[1] != self._dim:
+                print(f"⚠️ Embedding cache for {self.model_name} skipped vectors of size {vectors.shape[1]}")
+                return
+            for key, vector in zip(keys, vectors):
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._allocate()
+                    self._grow(row + 1)
+                self._matrix[row] = vector
+                self._keys[row] = np.frombuffer(key, dtype=np.uint8)
+                self._rows[key] = row
+            self._dirty = True
+
+    def save(self):
+        """Write new entries to disk; vectors first, so the index never points at unwritten rows."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._matrix.flush()
+            self._keys.flush()
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, mode="wb") as file:
+                pickle.dump({"version": CACHE_VERSION, "dim": self._dim, "rows": self._rows}, file)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+    def stats(self):
+        return {"entries": len(self._rows), "hits": self.hits, "misses": self.misses,
+                "bytes": 0 if self._matrix is None else self._matrix.nbytes}
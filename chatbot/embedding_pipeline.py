@@ -0,0 +1,98 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.memory import peak_rss_bytes
+
+# Documents embedded and written to Chroma per step
+EMBED_BATCH_SIZE = 1024
+# Texts per model forward pass
+ENCODE_BATCH_SIZE = 64
+# CPU processes for large builds; each holds its own copy of the model
+EMBED_WORKERS = min(4, os.cpu_count() or 1)
+# Below this many texts to embed, starting the worker pool costs more than it saves
+POOL_MIN_TEXTS = 20_000
+
+
+class EmbeddingPipeline:
+    """Embeds (id, document) pairs batch by batch and streams each batch to a writer.
+
+    ``model`` returns the SentenceTransformer and is only called once a text
+    misses ``cache``. While one batch is written, the next is embedded, so
+    at most two batches of vectors are held at once. After ``pool_min_texts``
+    texts have been embedded in this process, the remaining batches are
+    spread over a pool of ``workers`` CPU processes.
+    """
+
+    def __init__(self, model, cache=None, batch_size=EMBED_BATCH_SIZE, workers=EMBED_WORKERS,
+                 encode_batch_size=ENCODE_BATCH_SIZE, pool_min_texts=POOL_MIN_TEXTS):
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.workers = workers
+        self.encode_batch_size = encode_batch_size
+        self.pool_min_texts = pool_min_texts
+        self._pool = None
+        self._pooled = False
+        self._encoded = 0
+
+    def _encode(self, texts):
+        model = self.model()
+        if self._pool is None and self.workers > 1 and self._encoded >= self.pool_min_texts:
+            print(f"🔄 Embedding with {self.workers} worker processes")
+            self._pool = model.start_multi_process_pool(["cpu"] * self.workers)
+            self._pooled = True
+        self._encoded += len(texts)
+        if self._pool is not None:
+            return model.encode_multi_process(texts, self._pool, batch_size=self.encode_batch_size)
+        return model.encode(texts, batch_size=self.encode_batch_size, convert_to_numpy=True)
+
+    def embed(self, texts):
+        if self.cache is None:
+            return np.asarray(self._encode(texts), dtype=np.float32)
+        return self.cache.encode(texts, self._encode)
+
+    def _batches(self, documents):
+        batch = []
+        for item in documents:
+            batch.append(item)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def run(self, documents, write):
+        """Embed ``documents``, an iterable of (id, Document), calling ``write(batch, embeddings)`` per batch.
+
+        Returns the number of documents, how many the model encoded (the rest
+        came from the cache), the elapsed seconds, docs/sec and peak memory.
+        """
+        start = time.perf_counter()
+        self._encoded = 0
+        self._pooled = False
+        count = 0
+        pending = None
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-writer") as writer:
+                for batch in self._batches(documents):
+                    embeddings = self.embed([doc.page_content for _, doc in batch])
+                    if pending is not None:
+                        pending.result()
+                    pending = writer.submit(write, batch, embeddings)
+                    count += len(batch)
+                if pending is not None:
+                    pending.result()
+        finally:
+            if self._pool is not None:
+                self.model().stop_multi_process_pool(self._pool)
+                self._pool = None
+        seconds = time.perf_counter() - start
+        return {
+            "documents": count,
+            "encoded": self._encoded,
+            "seconds": seconds,
+            "docs_per_second": count / seconds if seconds else 0.0,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "worker_peak_rss_bytes": peak_rss_bytes(children=True) if self._pooled else None,
+        }
@@ -1,15 +1,22 @@
-from sentence_transformers import SentenceTransformer
 import streamlit as st
-import chromadb
+from chatbot.model_registry import get_registry
+from chatbot.vector_store_manager import document_id
 
 @st.cache_resource
 class EmbeddingStore:
     def __init__(self, collection_name="usage_data", db_path="./chroma_db"):
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.chroma_client = chromadb.PersistentClient(path=db_path)
+        self.embedding_cache = get_registry().embedding_cache()
+        self.chroma_client = get_registry().chroma_client(db_path)
         self.collection_name = collection_name
         self.collection = self._get_or_create_collection()
 
+    @property
+    def embedding_model(self):
+        return get_registry().embedding_model()
+
+    def embed(self, texts):
+        return self.embedding_cache.encode(texts, lambda missing: self.embedding_model.encode(missing))
+
     def _get_or_create_collection(self):
         try:
             return self.chroma_client.get_collection(name=self.collection_name)
@@ -21,17 +28,19 @@ class EmbeddingStore:
 
     def add_documents(self, documents):
         texts = [doc.page_content for doc in documents]
-        embeddings = self.embedding_model.encode(texts)
-        self.collection.add(
+        embeddings = self.embed(texts)
+        self.embedding_cache.save()
+        self.collection.upsert(
             embeddings=embeddings.tolist(),
             documents=texts,
             metadatas=[doc.metadata for doc in documents],
-            ids=[f"doc_{i}" for i in range(len(documents))]
+            ids=[document_id(doc) for doc in documents]
         )
 
     def count(self):
         return self.collection.count()
 
     def query(self, query_text, n_results=3):
-        query_embedding = self.embedding_model.encode(query_text).tolist()
+        query_embedding = self.embed([query_text])[0].tolist()
+        self.embedding_cache.save()
         return self.collection.query(query_embeddings=[query_embedding], n_results=n_results)
@@ -0,0 +1,31 @@
+import time
+
+FAKE_LLM_ENV = "PC_ANALYZER_FAKE_LLM"
+
+
+class FakeStreamingLLM:
+    """A stand-in for the Ollama client that streams a canned response.
+
+    Used with ``LLMHandler(llm=...)``, or for the whole app by setting
+    PC_ANALYZER_FAKE_LLM to the response text, to exercise streaming and
+    measure time-to-first-token without a model server.
+    """
+
+    def __init__(self, response="Answer: You spent most of your time in your browser.",
+                 first_token_delay=0.5, token_delay=0.05):
+        self.response = response
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        time.sleep(self.first_token_delay)
+        words = self.response.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.token_delay)
+            yield word if i == len(words) - 1 else word + " "
+
+    def invoke(self, prompt):
+        return "".join(self.stream(prompt))
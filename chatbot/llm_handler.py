@@ -1,9 +1,58 @@
-from langchain.prompts import PromptTemplate
-from langchain_ollama import OllamaLLM
+from typing import Iterator
+from chatbot.model_registry import get_registry
+
+# Labels the model sometimes puts in front of its answer
+RESPONSE_PREFIXES = ["Answer:", "A:", "AI:", "Response:"]
+ERROR_RESPONSE = "Sorry, I couldn't answer your question right now."
+CUT_OFF_NOTE = "\n\n⚠️ The answer was cut off by an error; ask again for a complete one."
+
+
+class LLMStreamError(Exception):
+    """The LLM failed after part of the answer had already been streamed."""
+
+
+class PrefixStripper:
+    """Removes labels such as "Answer:" from the start of a response streamed token by token.
+
+    Text is held back only while it could still turn into a label, so the
+    first token without one is passed on immediately.
+    """
+
+    def __init__(self, prefixes=RESPONSE_PREFIXES):
+        self.prefixes = prefixes
+        self._buffer = ""
+        self._started = False
+
+    def feed(self, token: str) -> str:
+        if self._started:
+            return token
+        text = (self._buffer + token).lstrip()
+        stripped = True
+        while stripped:
+            stripped = False
+            for prefix in self.prefixes:
+                if text.startswith(prefix):
+                    text = text[len(prefix):].lstrip()
+                    stripped = True
+        if not text or any(prefix.startswith(text) for prefix in self.prefixes):
+            self._buffer = text
+            return ""
+        self._started = True
+        self._buffer = ""
+        return text
+
+    def finish(self) -> str:
+        # A short response held back because it looked like the start of a label
+        text, self._buffer, self._started = self._buffer, "", True
+        return text
+
 
 class LLMHandler:
-    def __init__(self, model_name="llama3.1:8b-instruct-q4_0", temperature=0.1):
-        self.llm = OllamaLLM(model=model_name, temperature=temperature)
+    def __init__(self, model_name="llama3.1:8b-instruct-q4_0", temperature=0.1, registry=None, llm=None):
+        # LangChain is only imported once an LLM is actually needed
+        from langchain.prompts import PromptTemplate
+        # ``llm`` replaces the Ollama client, e.g. with chatbot.fake_llm.FakeStreamingLLM
+        self.llm = llm or (registry or get_registry()).llm(model_name, temperature)
         self.prompt = PromptTemplate.from_template("""
 You are a helpful assistant analyzing computer usage logs.
 Answer clearly and concisely in English based on the data below.
@@ -19,24 +68,38 @@ Question: {question}
 
 """)
 
-    def generate_response(self, context: str, question: str) -> str:
-        try:
-            response = (self.prompt | self.llm).invoke({
-                "context": context,
-                "question": question
-            })
-
-            if isinstance(response, str):
-                for prefix in ["Answer:", "A:", "AI:", "Response:"]:
-                    if prefix in response:
-                        response = response.split(prefix)[-1].strip()
-                return response.strip()
-
-            return str(response)
+    def stream_response(self, context: str, question: str) -> Iterator[str]:
+        """Yield the answer as the model generates it, without a leading "Answer:"-style label.
 
+        Raises LLMStreamError if the model fails after part of the answer was
+        yielded; a failure before that yields ERROR_RESPONSE instead.
+        """
+        stripper = PrefixStripper()
+        emitted = False
+        try:
+            for chunk in self.llm.stream(self.prompt.format(context=context, question=question)):
+                text = stripper.feed(chunk if isinstance(chunk, str) else str(chunk))
+                if text:
+                    emitted = True
+                    yield text
+            text = stripper.finish()
+            if text:
+                emitted = True
+                yield text
         except Exception as e:
             print(f"❌ LLM error: {e}")
-            return "Sorry, I couldn't answer your question right now."
+            if emitted:
+                raise LLMStreamError(str(e)) from e
+            yield ERROR_RESPONSE
+
+    def generate_response(self, context: str, question: str) -> str:
+        tokens = []
+        try:
+            for token in self.stream_response(context, question):
+                tokens.append(token)
+        except LLMStreamError:
+            tokens.append(CUT_OFF_NOTE)
+        return "".join(tokens).strip()
 
     def generate_simple_response(self, prompt: str) -> str:
-        return self.generate_response(context="", question=prompt)
\ No newline at end of file
+        return self.generate_response(context="", question=prompt)
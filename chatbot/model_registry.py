@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from chatbot.embedding_cache import EMBEDDING_CACHE_DIR, EmbeddingCache
+from chatbot.fake_llm import FAKE_LLM_ENV, FakeStreamingLLM
+from utils.memory import peak_rss_bytes
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+CHROMA_PATH = "./chroma_db"
+
+
+def _parameter_bytes(model):
+    # Weights of a torch module such as a SentenceTransformer
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except AttributeError:
+        return None
+
+
+class ModelRegistry:
+    """Embedding models, Chroma clients and LLM clients, each loaded once per process.
+
+    Thread-safe: when several sessions ask for a resource that isn't loaded
+    yet, one of them loads it and the others wait for that copy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resources = {}
+        self._load_locks = {}
+        self._info = {}
+
+    def _get(self, key, load, size=None):
+        with self._lock:
+            if key in self._resources:
+                return self._resources[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                if key in self._resources:
+                    return self._resources[key]
+            start = time.perf_counter()
+            value = load()
+            info = {"load_seconds": time.perf_counter() - start, "bytes": size(value) if size else None}
+            with self._lock:
+                self._resources[key] = value
+                self._info[key] = info
+            return value
+
+    def embedding_model(self, name=EMBEDDING_MODEL):
+        def load():
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(name)
+        return self._get(("embedding model", name), load, _parameter_bytes)
+
+    def embedding_cache(self, name=EMBEDDING_MODEL, directory=EMBEDDING_CACHE_DIR):
+        def load():
+            return EmbeddingCache(name, directory)
+        return self._get(("embedding cache", name, os.path.abspath(directory)), load)
+
+    def chroma_client(self, path=CHROMA_PATH):
+        def load():
+            import chromadb
+            return chromadb.PersistentClient(path=path)
+        return self._get(("Chroma client", os.path.abspath(path)), load)
+
+    def llm(self, model_name, temperature=0.1):
+        # The model itself runs in the Ollama server; this is only its client
+        def load():
+            if os.environ.get(FAKE_LLM_ENV):
+                return FakeStreamingLLM(os.environ[FAKE_LLM_ENV])
+            from langchain_ollama import OllamaLLM
+            return OllamaLLM(model=model_name, temperature=temperature)
+        return self._get(("LLM client", model_name, temperature), load)
+
+    def memory_report(self):
+        """What has been loaded, how long it took and (where known) its size in bytes."""
+        with self._lock:
+            resources = [{"kind": key[0], "name": key[1], **info} for key, info in self._info.items()]
+        return {"resources": resources, "peak_rss_bytes": peak_rss_bytes()}
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    return _registry
@@ -1,16 +1,47 @@
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pandas as pd
-
-def perform_quick_analysis(df: pd.DataFrame, question_type: str, question: str) -> Dict[str, Any]:
-    if df.empty:
+from storage import sqlite_store
+from storage.rollups import UsageRollups
+
+# Days before today each question looks at (None: all history)
+ANALYSIS_WINDOW_DAYS = {
+    'daily_total': 0,
+    'app_ranking': 0,
+    'yesterday_comparison': 1,
+    'weekly_trend': 7,
+    'hourly_pattern': None,
+    'weekly_productivity': 7,
+    'most_focused_day': 7,
+}
+
+def analysis_start_date(question_type: str):
+    days = ANALYSIS_WINDOW_DAYS.get(question_type)
+    return None if days is None else datetime.now().date() - timedelta(days=days)
+
+def perform_sqlite_quick_analysis(path: str, question_type: str, question: str) -> Dict[str, Any]:
+    # The question's window becomes an indexed range scan and GROUP BY
+    if sqlite_store.get_date_bounds(path)[0] is None:
+        return {"error": "No data found"}
+    rollups = sqlite_store.query_rollups(path, start_date=analysis_start_date(question_type))
+    return perform_quick_analysis(None, question_type, question, rollups)
+
+def perform_quick_analysis(df: Optional[pd.DataFrame], question_type: str, question: str,
+                           rollups: Optional[UsageRollups] = None) -> Dict[str, Any]:
+    # Every answer below comes from the day x app and day x hour rollups. Given
+    # rollups, df may be None; they only need to cover analysis_start_date onwards.
+    if rollups is None:
+        if df.empty:
+            return {"error": "No data found"}
+        rollups = UsageRollups.from_rows(df)
+    if rollups.empty:
         return {"error": "No data found"}
 
     today = datetime.now().date()
     yesterday = today - timedelta(days=1)
 
     if question_type == 'daily_total':
-        today_data = df[df['date'] == today]
+        today_data = rollups.on_date(today)
         total_seconds = today_data['duration'].sum()
         total_minutes = total_seconds // 60
         total_hours = total_minutes // 60
@@ -21,17 +52,17 @@ def perform_quick_analysis(df: pd.DataFrame, question_type: str, question: str)
             'total_minutes': total_minutes,
             'total_hours': total_hours,
             'remaining_minutes': remaining_minutes,
-            'app_count': today_data['app_name'].nunique(),
-            'most_used_today': today_data.groupby('app_name')['duration'].sum().idxmax() if not today_data.empty else None
+            'app_count': len(today_data),
+            'most_used_today': today_data.loc[today_data['duration'].idxmax(), 'app_name'] if not today_data.empty else None
         }
 
     elif question_type == 'app_ranking':
         today = datetime.now().date()
-        today_data = df[df['date'] == today]
+        today_data = rollups.on_date(today)
         if today_data.empty:
             return {"error": "No usage data found for today"}
 
-        app_totals = today_data.groupby('app_name')['duration'].sum().sort_values(ascending=False)
+        app_totals = today_data.set_index('app_name')['duration'].sort_values(ascending=False)
         if app_totals.empty:
             return {"error": "No app usage data"}
 
@@ -50,8 +81,8 @@ def perform_quick_analysis(df: pd.DataFrame, question_type: str, question: str)
 
 
     elif question_type == 'yesterday_comparison':
-        today_data = df[df['date'] == today]
-        yesterday_data = df[df['date'] == yesterday]
+        today_data = rollups.on_date(today)
+        yesterday_data = rollups.on_date(yesterday)
 
         today_total = today_data['duration'].sum() // 60
         yesterday_total = yesterday_data['duration'].sum() // 60
@@ -69,8 +100,9 @@ def perform_quick_analysis(df: pd.DataFrame, question_type: str, question: str)
 
     elif question_type == 'weekly_trend':
         week_ago = today - timedelta(days=7)
-        weekly_data = df[df['date'] >= week_ago]
-        daily_totals = weekly_data.groupby('date')['duration'].sum() // 60
+        daily_totals = rollups.select(start_date=week_ago).daily_totals() // 60
+        if daily_totals.empty:
+            return {"error": "No data for the last week"}
 
         return {
             'type': 'weekly_trend',
@@ -83,7 +115,9 @@ def perform_quick_analysis(df: pd.DataFrame, question_type: str, question: str)
         }
 
     elif question_type == 'hourly_pattern':
-        hourly_totals = df.groupby('hour')['duration'].sum() // 60
+        hourly_totals = rollups.hourly_totals() // 60
+        if hourly_totals.empty:
+            return {"error": "No data found"}
         peak_hour = hourly_totals.idxmax()
 
         return {
@@ -97,8 +131,8 @@ def perform_quick_analysis(df: pd.DataFrame, question_type: str, question: str)
 
     elif question_type == "weekly_productivity":
         week_ago = today - timedelta(days=7)
-        week_data = df[df['date'] >= week_ago]
-        total_seconds = week_data['duration'].sum()
+        week_data = rollups.select(start_date=week_ago)
+        total_seconds = week_data.total_duration()
         total_minutes = total_seconds // 60
         total_hours = total_minutes // 60
         remaining_minutes = total_minutes % 60
@@ -109,16 +143,16 @@ def perform_quick_analysis(df: pd.DataFrame, question_type: str, question: str)
             "total_minutes": total_minutes,
             "total_hours": total_hours,
             "remaining_minutes": remaining_minutes,
-            "app_count": week_data['app_name'].nunique()
+            "app_count": len(week_data.app_totals)
         }
     
     elif question_type == 'most_focused_day':
         week_ago = today - timedelta(days=7)
-        week_data = df[df['date'] >= week_ago]
+        week_data = rollups.select(start_date=week_ago)
         if week_data.empty:
             return {"error": "No data for the last week"}
 
-        daily_totals = week_data.groupby('date')['duration'].sum()
+        daily_totals = week_data.daily_totals()
         max_day = daily_totals.idxmax()
         max_duration = daily_totals.max()
 
@@ -1,118 +1,106 @@
 import logging
 import re
-import pandas as pd
-from typing import List, Dict, Any
-from langchain.schema import Document
-from sentence_transformers import SentenceTransformer
-from chatbot.vector_store_manager import VectorStoreManager
-from chatbot.llm_handler import LLMHandler
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Iterator
+from storage.incremental_loader import IncrementalUsageLoader
+from storage import sqlite_store
+from chatbot.answer_cache import AnswerCache
+from chatbot.document_processor import DocumentProcessor
+from chatbot.embedding_pipeline import EMBED_BATCH_SIZE
+from chatbot.llm_handler import CUT_OFF_NOTE, ERROR_RESPONSE, LLMStreamError
+from chatbot.model_registry import get_registry
 from chatbot.quick_questions import quick_question_patterns
-from chatbot.quick_analysis import perform_quick_analysis
+from chatbot.quick_analysis import perform_quick_analysis, perform_sqlite_quick_analysis
 from chatbot.quick_questions import classify_question as external_classify_question
 
 
 class UsageDataRAG:
-    def __init__(self, csv_path="data/usage_log.csv", model_name="llama3.1:8b-instruct-q4_0"):
-        self.csv_path = csv_path
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.vector_store = VectorStoreManager(collection_name="usage_data")
-        self.llm_handler = LLMHandler(model_name=model_name)
+    """Answers usage questions from quick analyses, or from the vector store and LLM.
+
+    The embedding model, Chroma and the LLM client (and with them torch and
+    LangChain) are only loaded by the first question that needs them; quick
+    questions never do. They come from ``registry`` (by default the
+    process-wide one), so engines never hold private copies, and one engine
+    can serve every session: it keeps no per-user state. ``llm`` replaces
+    the Ollama client, e.g. with a ``chatbot.fake_llm.FakeStreamingLLM``.
+    """
 
-        self.df = None
+    def __init__(self, csv_path=None, model_name="llama3.1:8b-instruct-q4_0", registry=None, llm=None):
+        self.csv_path = csv_path
+        self.model_name = model_name
+        self.llm = llm
+        self.registry = registry or get_registry()
+        self._vector_store = None
+        self._llm_handler = None
+        self._init_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # refresh() and reading its rollups happen together
+        self._load_lock = threading.Lock()
+        # Loader version the vector store was last synced with
+        self._synced_version = None
+        self.answer_cache = AnswerCache()
+
+        # Quick analyses and documents only need the rollups; the dashboard's
+        # loader holds the rows, so this one keeps none
+        self._usage_loader = IncrementalUsageLoader(csv_path, keep_rows=False)
         self.quick_question_patterns = quick_question_patterns
 
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-        self._load_and_process_data()
-
-    def _load_usage_data(self):
-        if self.df is not None:
-            return self.df
-
-        try:
-            df = pd.read_csv(self.csv_path)
-            df["duration"] = pd.to_numeric(df["duration"], errors="coerce")
-            df = df[df["duration"].notnull()].copy()
-            df["duration"] = df["duration"].astype(int)
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-            df["date"] = df["timestamp"].dt.date
-            df["hour"] = df["timestamp"].dt.hour
-            df["weekday"] = df["timestamp"].dt.day_name()
-            self.df = df
-            return df
-        except Exception as e:
-            self.logger.error(f"❌ Error loading data: {e}")
-            return pd.DataFrame()
-
-    def _create_documents(self, df: pd.DataFrame) -> List[Document]:
-        documents = []
-
-        # Daily app-based total time
-        daily_stats = df.groupby(['date', 'app_name'])['duration'].sum().reset_index()
-        for _, row in daily_stats.iterrows():
-            minutes = row['duration'] // 60
-            seconds = row['duration'] % 60
-            content = f"Date: {row['date']}, App: {row['app_name']}, Duration: {minutes} minutes {seconds} seconds"
-            documents.append(Document(
-                page_content=content,
-                metadata={
-                    "date": str(row['date']),
-                    "app_name": row['app_name'],
-                    "duration": row['duration'],
-                    "type": "daily_usage"
-                }
-            ))
-
-        # Hourly total activity
-        hourly_stats = df.groupby(['date', 'hour'])['duration'].sum().reset_index()
-        for _, row in hourly_stats.iterrows():
-            if row['duration'] > 300:  # 5 dakikadan fazla
-                content = f"Date: {row['date']}, Hour: {row['hour']}:00, Total Activity: {row['duration']//60} minutes"
-                documents.append(Document(
-                    page_content=content,
-                    metadata={
-                        "date": str(row['date']),
-                        "hour": row['hour'],
-                        "duration": row['duration'],
-                        "type": "hourly_activity"
-                    }
-                ))
-
-        # App-based total and average usage
-        app_totals = df.groupby('app_name')['duration'].agg(['sum', 'count']).reset_index()
-        for _, row in app_totals.iterrows():
-            total_minutes = row['sum'] // 60
-            avg_session = (row['sum'] / row['count']) // 60
-            content = (f"App: {row['app_name']}, Total Usage: {total_minutes} minutes, "
-                      f"Average Session: {avg_session} minutes, Used {row['count']} times")
-            documents.append(Document(
-                page_content=content,
-                metadata={
-                    "app_name": row['app_name'],
-                    "total_duration": row['sum'],
-                    "session_count": row['count'],
-                    "type": "app_summary"
-                }
-            ))
-
-        self.logger.info(f"✅ {len(documents)} documents created")
-        return documents
-
-    def _load_and_process_data(self):
-        df = self._load_usage_data()
-        if df.empty:
-            self.logger.warning("Dataframe is empty, skipping vector store load")
-            return
-        existing_count = self.vector_store.get_collection_count()
-        if existing_count == 0:
-            documents = self._create_documents(df)
-            texts = [doc.page_content for doc in documents]
-            embeddings = self.embedding_model.encode(texts)
-            self.vector_store.add_documents(embeddings.tolist(), texts, [doc.metadata for doc in documents])
-            self.logger.info(f"✅ {len(documents)} records added to vector store")
-        else:
-            self.logger.info(f"✅ Vector store already has {existing_count} records")
+    @property
+    def embedding_model(self):
+        return self.registry.embedding_model()
+
+    @property
+    def vector_store(self):
+        with self._init_lock:
+            if self._vector_store is None:
+                from chatbot.vector_store_manager import VectorStoreManager
+                vector_store = VectorStoreManager(collection_name="usage_data", registry=self.registry)
+                self._sync_vector_store(vector_store)
+                self._vector_store = vector_store
+            return self._vector_store
+
+    @property
+    def llm_handler(self):
+        with self._init_lock:
+            if self._llm_handler is None:
+                from chatbot.llm_handler import LLMHandler
+                self._llm_handler = LLMHandler(model_name=self.model_name, registry=self.registry, llm=self.llm)
+            return self._llm_handler
+
+    def warm_up(self):
+        # Loads everything a general question needs, e.g. from a background thread
+        self.vector_store
+        self.llm_handler
+
+    def _load_rollups(self):
+        # Only rows appended since the previous call are parsed
+        with self._load_lock:
+            self._usage_loader.refresh()
+            return self._usage_loader.rollups, self._usage_loader.version
+
+    def _sync_vector_store(self, vector_store):
+        # Re-indexes only the documents the rows appended since the last sync changed
+        with self._sync_lock:
+            rollups, version = self._load_rollups()
+            if version == self._synced_version:
+                return
+            if rollups.empty:
+                self.logger.warning("No usage data, skipping vector store load")
+                return
+            # Documents are built batch by batch as the embedder consumes them
+            batches = DocumentProcessor.iter_documents(rollups, EMBED_BATCH_SIZE)
+            stats = vector_store.sync_documents(batches)
+            self._synced_version = version
+            peak = stats["peak_rss_bytes"]
+            self.logger.info(f"✅ Vector store synced: {stats['documents']} of {stats['total']} documents "
+                             f"upserted ({stats['encoded']} encoded, {stats['docs_per_second']:.0f} docs/s), "
+                             f"{stats['deleted']} deleted"
+                             + (f", peak memory {peak / 2**20:.0f} MB" if peak else ""))
 
     def _classify_question(self, question: str) -> str:
         category = external_classify_question(question)
@@ -169,21 +157,92 @@ Express numbers in natural language and add extra comments if needed.
             return "Sorry, an error occurred while generating the response."
 
 
+    def _dataset_version(self):
+        # Answers are cached per day too: "today" moves at midnight even without new rows
+        if sqlite_store.is_sqlite_log(self._usage_loader.path):
+            with sqlite_store.open_reader(self._usage_loader.path) as conn:
+                return date.today(), sqlite_store.max_row_id(conn)
+        return date.today(), self._load_rollups()[1]
+
     def answer_question(self, question: str) -> str:
+        return "".join(self._answer_tokens(question)).strip()
+
+    def stream_answer(self, question: str) -> "AnswerStream":
+        """The answer to ``question`` as an iterable of text chunks, timed as it is consumed.
+
+        General questions stream the LLM's tokens as they are generated;
+        quick and cached answers arrive as one chunk.
+        """
+        return AnswerStream(self._answer_tokens(question), self.logger)
+
+    def _answer_tokens(self, question: str) -> Iterator[str]:
+        version = self._dataset_version()
+        cached = self.answer_cache.get(question, version)
+        if cached is not None:
+            self.logger.info("Answered from the answer cache")
+            yield cached
+            return
+
         question_type = self._classify_question(question)
         self.logger.info(f"Classified question type: {question_type}")
 
         if question_type != 'general':
             self.logger.info(f"Performing quick analysis for question type: {question_type}")
-            analysis_result = perform_quick_analysis(self._load_usage_data(), question_type, question)
-            response = self._generate_explanation_from_analysis(analysis_result, question)
-            return response.strip()
+            if sqlite_store.is_sqlite_log(self._usage_loader.path):
+                analysis_result = perform_sqlite_quick_analysis(self._usage_loader.path, question_type, question)
+            else:
+                analysis_result = perform_quick_analysis(None, question_type, question, self._load_rollups()[0])
+            response = self._generate_explanation_from_analysis(analysis_result, question).strip()
+            if 'error' not in analysis_result:
+                self.answer_cache.put(question, version, response)
+            yield response
         else:
             self.logger.info("Performing general query using vector store")
             try:
-                context = self.vector_store.query_relevant_docs(question)
-                response = self.llm_handler.generate_response(context, question)
-                return response.strip()
+                vector_store = self.vector_store
+                self._sync_vector_store(vector_store)
+                # Also warms the embedding cache for the retrieval query below
+                embedding = vector_store.embed([question])[0]
+                cached = self.answer_cache.get_similar(embedding, version)
+                if cached is not None:
+                    self.logger.info("Answered from the answer cache (similar question)")
+                    yield cached
+                    return
+                context = vector_store.query_relevant_docs(question)
             except Exception as e:
                 self.logger.error(f"Error in vector store or LLM response: {e}")
-                return "Sorry, an error occurred while answering the general question."
+                yield "Sorry, an error occurred while answering the general question."
+                return
+            tokens = []
+            try:
+                for token in self.llm_handler.stream_response(context, question):
+                    tokens.append(token)
+                    yield token
+            except LLMStreamError:
+                # A truncated answer is shown as such and never cached
+                yield CUT_OFF_NOTE
+                return
+            response = "".join(tokens).strip()
+            if response != ERROR_RESPONSE:
+                self.answer_cache.put(question, version, response, embedding)
+
+
+class AnswerStream:
+    """Iterates over an answer's chunks, recording time to first token and in total."""
+
+    def __init__(self, tokens, logger=None):
+        self._tokens = tokens
+        self.logger = logger
+        self.first_token_seconds = None
+        self.seconds = None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        for token in self._tokens:
+            if self.first_token_seconds is None:
+                self.first_token_seconds = time.perf_counter() - start
+            yield token
+        self.seconds = time.perf_counter() - start
+        if self.logger and self.first_token_seconds is not None:
+            self.logger.info(f"⏱️ First token after {self.first_token_seconds:.2f} s, "
+                             f"answer complete after {self.seconds:.2f} s")
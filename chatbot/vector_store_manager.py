@@ -1,12 +1,50 @@
-from sentence_transformers import SentenceTransformer
-import chromadb
+import hashlib
+from chatbot.embedding_pipeline import EmbeddingPipeline
+from chatbot.model_registry import get_registry
+
+# Metadata fields identifying each document type; a document's ID is derived
+# from them, so it stays the same while its text (the durations) changes
+DOCUMENT_KEYS = {
+    "daily_usage": ("date", "app_name"),
+    "hourly_activity": ("date", "hour"),
+    "app_summary": ("app_name",),
+}
+# Obsolete documents deleted per Chroma call
+SYNC_BATCH_SIZE = 1000
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def document_id(doc):
+    doc_type = doc.metadata["type"]
+    key = "\x1f".join(str(doc.metadata[field]) for field in DOCUMENT_KEYS[doc_type])
+    return f"{doc_type}-{_digest(key)[:20]}"
+
+
+def content_hash(doc):
+    return _digest(doc.page_content)
+
 
 class VectorStoreManager:
-    def __init__(self, collection_name="usage_data", persist_path="./chroma_db"):
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.chroma_client = chromadb.PersistentClient(path=persist_path)
+    def __init__(self, collection_name="usage_data", persist_path="./chroma_db", registry=None):
+        # The model and client are shared process-wide and loaded on first use
+        self.registry = registry or get_registry()
+        self.embedding_cache = self.registry.embedding_cache()
+        self.chroma_client = self.registry.chroma_client(persist_path)
         self.collection_name = collection_name
         self.collection = self._get_or_create_collection()
+        # Content hash of every indexed document by ID, read from Chroma on the first sync
+        self._hashes = None
+
+    @property
+    def embedding_model(self):
+        # Only loaded once a text misses the embedding cache
+        return self.registry.embedding_model()
+
+    def embed(self, texts):
+        return self.embedding_cache.encode(texts, lambda missing: self.embedding_model.encode(missing))
 
     def _get_or_create_collection(self):
         try:
@@ -22,23 +60,66 @@ class VectorStoreManager:
             return collection
 
     def add_documents(self, documents):
-        texts = [doc.page_content for doc in documents]
-        embeddings = self.embedding_model.encode(texts)
-        ids = [f"doc_{i}" for i in range(len(documents))]
+        stats = self._upsert((document_id(doc), doc) for doc in documents)
+        print(f"✅ {stats['documents']} records added to vector store "
+              f"({stats['docs_per_second']:.0f} docs/s).")
 
-        self.collection.add(
+    def _write(self, batch, embeddings):
+        self.collection.upsert(
             embeddings=embeddings.tolist(),
-            documents=texts,
-            metadatas=[doc.metadata for doc in documents],
-            ids=ids
+            documents=[doc.page_content for _, doc in batch],
+            metadatas=[{**doc.metadata, "content_hash": content_hash(doc)} for _, doc in batch],
+            ids=[doc_id for doc_id, _ in batch]
         )
-        print(f"✅ {len(documents)} records added to vector store.")
+        if self._hashes is not None:
+            self._hashes.update((doc_id, content_hash(doc)) for doc_id, doc in batch)
+
+    def _upsert(self, keyed_documents):
+        pipeline = EmbeddingPipeline(lambda: self.embedding_model, self.embedding_cache)
+        stats = pipeline.run(keyed_documents, self._write)
+        self.embedding_cache.save()
+        return stats
+
+    def _indexed_hashes(self):
+        if self._hashes is None:
+            existing = self.collection.get(include=["metadatas"])
+            self._hashes = {doc_id: (metadata or {}).get("content_hash")
+                            for doc_id, metadata in zip(existing["ids"], existing["metadatas"])}
+        return self._hashes
+
+    def sync_documents(self, batches):
+        """Make the collection hold exactly the documents in ``batches`` (lists of documents).
+
+        Only documents that are new or whose text changed are embedded and
+        upserted, as the batches come in; documents no longer produced are
+        deleted at the end. Returns the embedding pipeline's statistics with
+        the total and deleted document counts added.
+        """
+        indexed = self._indexed_hashes()
+        seen = set()
+
+        def changed():
+            for batch in batches:
+                for doc in batch:
+                    doc_id = document_id(doc)
+                    seen.add(doc_id)
+                    if indexed.get(doc_id) != content_hash(doc):
+                        yield doc_id, doc
+
+        stats = self._upsert(changed())
+        obsolete = [doc_id for doc_id in indexed if doc_id not in seen]
+        for start in range(0, len(obsolete), SYNC_BATCH_SIZE):
+            self.collection.delete(ids=obsolete[start:start + SYNC_BATCH_SIZE])
+        for doc_id in obsolete:
+            del indexed[doc_id]
+        return {**stats, "total": len(seen), "deleted": len(obsolete)}
 
     def get_collection_count(self):
         return self.collection.count()
 
     def query(self, query_text, n_results=3):
-        query_embedding = self.embedding_model.encode(query_text).tolist()
+        query_embedding = self.embed([query_text])[0].tolist()
+        self.embedding_cache.save()
         results = self.collection.query(query_embeddings=[query_embedding], n_results=n_results)
         return results
 
@@ -1,55 +1,81 @@
 import streamlit as st
 
+# Questions and answers kept per browser session
+MAX_CHAT_HISTORY = 20
+
+def set_query(query):
+    st.session_state["user_input_stable"] = query
+
+def clear_query():
+    st.session_state["user_input_stable"] = ""
+
+def ask(query):
+    from utils.instance import get_rag_instance
+
+    # The answer is shown as it is generated, then handed to the history below
+    placeholder = st.empty()
+    placeholder.info("🤖 AI is analyzing your data...")
+    stream = get_rag_instance().stream_answer(query)
+    response = ""
+    for token in stream:
+        response += token
+        placeholder.success(f"**AI Assistant:** {response}▌")
+    placeholder.empty()
+    history = st.session_state.setdefault("chat_history", [])
+    history.append((query, response.strip(), stream.first_token_seconds, stream.seconds))
+    del history[:-MAX_CHAT_HISTORY]
+
 def render_ai_chat():
 
     st.subheader("💬 Ask About Your Usage")
     st.markdown("**Quick Questions:**")
 
     # Quick questions - set query with session state
+    # A keyed text input ignores value= once it exists, so the callbacks set its state
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("📱 What app did I use most today?", key="q1_stable"):
-            st.session_state["active_query"] = "What app did I use most today?"
-            
-        if st.button("⏰ What are my most active hours?", key="q2_stable"):
-            st.session_state["active_query"] = "What are my most active hours?"
-            
+        st.button("📱 What app did I use most today?", key="q1_stable", on_click=set_query,
+                  args=("What app did I use most today?",))
+        st.button("⏰ What are my most active hours?", key="q2_stable", on_click=set_query,
+                  args=("What are my most active hours?",))
+
     with col2:
-        if st.button("📊 How productive was I this week?", key="q3_stable"):
-            st.session_state["active_query"] = "How productive was I this week?"
-            
-        if st.button("🎯 Which day was I most focused?", key="q4_stable"):
-            st.session_state["active_query"] = "Which day was I most focused?"
+        st.button("📊 How productive was I this week?", key="q3_stable", on_click=set_query,
+                  args=("How productive was I this week?",))
+        st.button("🎯 Which day was I most focused?", key="q4_stable", on_click=set_query,
+                  args=("Which day was I most focused?",))
 
     # Text input
     user_query = st.text_input(
         "💭 Ask me anything:",
-        value=st.session_state.get("active_query", ""),
         placeholder="e.g., How much time did I spend on work apps?",
         key="user_input_stable"
     )
 
     # Clear button
-    if st.button("🗑️ Clear Query", key="clear_stable"):
-        if "active_query" in st.session_state:
-            del st.session_state["active_query"]
-        st.rerun()
+    # A callback instead of st.rerun(), which would rerun the whole app rather than this page
+    st.button("🗑️ Clear Query", key="clear_stable", on_click=clear_query)
 
     # Process query
-    if user_query:
-        # Chatbot operations
+    # Only a new question is sent to the chatbot; reruns show the stored answer
+    history = st.session_state.get("chat_history", [])
+    if user_query and (not history or history[-1][0] != user_query):
         try:
-            from utils.instance import get_rag_instance
-            
-            # Loading state
-            with st.spinner("🤖 AI is analyzing your data..."):
-                chatbot = get_rag_instance()
-                response = chatbot.answer_question(user_query)
-            
-            # Response
-            st.success(f"**AI Assistant:** {response}")
-            
+            ask(user_query)
         except Exception as e:
             st.error(f"❌ Error processing your question: {str(e)}")
             st.info("💡 Try rephrasing your question or check if your data is loaded correctly.")
 
+    # Response, then earlier questions of this session
+    history = st.session_state.get("chat_history", [])
+    if history:
+        query, response, first_token_seconds, seconds = history[-1]
+        st.success(f"**AI Assistant:** {response}")
+        if first_token_seconds is not None:
+            st.caption(f"⏱️ First token after {first_token_seconds:.2f} s, full answer after {seconds:.2f} s")
+        if len(history) > 1:
+            with st.expander(f"🕘 Earlier questions ({len(history) - 1})"):
+                for query, response, *_ in reversed(history[:-1]):
+                    st.markdown(f"**You:** {query}")
+                    st.markdown(f"**AI Assistant:** {response}")
+
@@ -2,15 +2,82 @@ from datetime import datetime, timedelta
 import streamlit as st
 import plotly.express as px
 
+# Live refresh intervals offered on the dashboard, in seconds
+LIVE_INTERVALS = [2, 5, 10, 30, 60]
+LIVE_DEFAULT_INTERVAL = 5
+
+
+def _top_apps_figure(app_totals):
+    app_usage = app_totals.head(5)
+    app_usage_min = (app_usage / 60).round(1)
+    return px.bar(x=app_usage_min.values,
+                  y=app_usage_min.index, orientation='h',
+                  title="Top 5 Applications by Usage Time (minutes)",
+                  labels={'x': 'Minutes', 'y': 'Application'})
+
+
+def _hourly_figure(hourly):
+    return px.bar(x=hourly.index, y=(hourly / 60).round(1).values,
+                  title="Today's Activity by Hour (minutes)",
+                  labels={'x': 'Hour of Day', 'y': 'Minutes'})
+
+
+def _render_live(live_usage):
+    # Runs every few seconds on its own; a tick only reads rows logged since the last one
+    snapshot = live_usage.tick()
+    today_total = snapshot["today_total"] // 60
+    yesterday_total = snapshot["yesterday_total"] // 60
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Today", f"{today_total} minutes", delta=f"{today_total - yesterday_total} min")
+    with col2:
+        st.metric("Yesterday", f"{yesterday_total} minutes")
+    with col3:
+        st.metric("Sessions Today", snapshot["today_sessions"])
+    st.caption(f"Updated {datetime.now():%H:%M:%S}")
+
+    if not snapshot["today_sessions"]:
+        st.info("No activity logged today yet.")
+        return
+    # Figures are only rebuilt when a tick brought new rows
+    figures = st.session_state.get("live_figures")
+    if figures is None or figures[0] != (snapshot["day"], snapshot["version"]):
+        figures = ((snapshot["day"], snapshot["version"]),
+                   _top_apps_figure(snapshot["apps"]["duration"]), _hourly_figure(snapshot["hourly"]))
+        st.session_state.live_figures = figures
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(figures[1], use_container_width=True)
+    with col2:
+        st.plotly_chart(figures[2], use_container_width=True)
+
+
+def render_dashboard(aggregates, live_usage=None):
+    # aggregates: the selection's UsageAggregates, e.g. UsageAggregates.from_rows(df)
+    live = False
+    if live_usage is not None:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            live = st.toggle("🔴 Live", key="live_mode", help="Follow new tracker events as they are logged")
+        with col2:
+            interval = st.select_slider("Refresh every (seconds)", LIVE_INTERVALS, value=LIVE_DEFAULT_INTERVAL,
+                                        key="live_interval", disabled=not live)
+        if live:
+            st.subheader("📡 Today, Live")
+            st.fragment(_render_live, run_every=interval)(live_usage)
 
-def render_dashboard(filtered_df):
     st.subheader("📊 Usage Overview")
-    if not filtered_df.empty:
+    # The rollup counts tell whether the selection has rows without loading them
+    if aggregates.total_sessions():
+        app_totals = aggregates.app_totals()["duration"]
+
         col1, col2, col3, col4 = st.columns(4)
-        total_time = filtered_df["duration"].sum()
-        total_apps = filtered_df["app_name"].nunique()
-        avg_session = filtered_df["duration"].mean()
-        most_used = filtered_df.groupby("app_name")["duration"].sum().idxmax()
+        total_time = aggregates.total_duration()
+        total_apps = len(app_totals)
+        total_sessions = aggregates.total_sessions()
+        avg_session = total_time / total_sessions if total_sessions else 0
+        most_used = app_totals.index[0] if not app_totals.empty else "—"
 
         with col1:
             st.metric("Total Time", f"{total_time // 3600}h {(total_time % 3600) // 60}m")
@@ -24,28 +91,25 @@ def render_dashboard(filtered_df):
             <div style='text-align: center; font-size: 22px; color: white;'>{most_used}</div>
             """, unsafe_allow_html=True)
 
-        # Daily Comparison
-        st.subheader("📅 Daily Comparison")
-        col1, col2 = st.columns(2)
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
+        # Daily Comparison (shown live above instead when live mode is on)
+        if not live:
+            st.subheader("📅 Daily Comparison")
+            col1, col2 = st.columns(2)
+            today = datetime.now().date()
+            yesterday = today - timedelta(days=1)
 
-        today_total = filtered_df[filtered_df["date"] == today]["duration"].sum() // 60
-        yesterday_total = filtered_df[filtered_df["date"] == yesterday]["duration"].sum() // 60
+            daily_totals = aggregates.daily_totals()
+            today_total = int(daily_totals.get(today, 0)) // 60
+            yesterday_total = int(daily_totals.get(yesterday, 0)) // 60
 
-        with col1:
-            st.metric("Today", f"{today_total} minutes", delta=f"{today_total - yesterday_total} min")
-        with col2:
-            st.metric("Yesterday", f"{yesterday_total} minutes")
+            with col1:
+                st.metric("Today", f"{today_total} minutes", delta=f"{today_total - yesterday_total} min")
+            with col2:
+                st.metric("Yesterday", f"{yesterday_total} minutes")
 
         # Top Applications
         st.subheader("🏆 Top Applications")
-        app_usage = filtered_df.groupby("app_name")["duration"].sum().sort_values(ascending=False).head(5)
-        app_usage_min = (app_usage / 60).round(1)
-        fig = px.bar(x=app_usage_min.values,
-                     y=app_usage_min.index, orientation='h',
-                     title="Top 5 Applications by Usage Time (minutes)",
-                     labels={'x': 'Minutes', 'y': 'Application'})
+        fig = aggregates.get("top_apps_figure", lambda: _top_apps_figure(app_totals))
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.warning("No data available for the selected filters.")
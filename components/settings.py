@@ -1,22 +1,77 @@
 import streamlit as st
 import os
-import pandas as pd
-from datetime import datetime
+import uuid
+from storage.export import EXPORT_FORMATS, available_formats, export_usage_log
 
+EXPORT_DIR = "data/exports"
 
-def render_settings(df):
+
+def render_settings(info, date_range=None, cache_stats=None, model_report=None):
     st.subheader("Configuration & Data Management")
     st.subheader("📂 Data Information")
-    if not df.empty:
+    if info["rows"]:
         col1, col2 = st.columns(2)
         with col1:
-            st.info(f"**Total Records:** {len(df)}")
-            st.info(f"**Date Range:** {df['date'].min()} to {df['date'].max()}")
+            st.info(f"**Total Records:** {info['rows']}")
+            st.info(f"**Date Range:** {info['first_date']} to {info['last_date']}")
         with col2:
-            st.info(f"**Unique Applications:** {df['app_name'].nunique()}")
-            st.info(f"**File Size:** {os.path.getsize('data/usage_log.csv') / 1024:.1f} KB")
+            if info["apps"] is not None:
+                st.info(f"**Unique Applications:** {info['apps']}")
+            st.info(f"**File Size:** {info['size'] / 1024:.1f} KB")
+        if cache_stats:
+            st.caption(f"Aggregation cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                       f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024:.0f} KB)")
+        if model_report:
+            render_model_report(model_report)
 
     st.subheader("📥 Export Data")
-    csv = df.to_csv(index=False)
-    st.download_button("💾 Download CSV", data=csv, file_name="usage_data.csv", mime="text/csv")
- 
\ No newline at end of file
+    # Nothing is serialized until "Prepare export" is clicked; the file is then
+    # streamed to disk in chunks instead of built as one string in memory
+    col1, col2 = st.columns(2)
+    with col1:
+        export_format = st.selectbox("Format", available_formats())
+    with col2:
+        scopes = ["All data"] + (["Selected date range"] if date_range else [])
+        scope = st.radio("Rows", scopes, horizontal=True)
+
+    if st.button("📦 Prepare export"):
+        start_date, end_date = date_range if scope == "Selected date range" else (None, None)
+        extension, mime = EXPORT_FORMATS[export_format]
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        # A file of its own per export, so sessions exporting at once don't overwrite each other
+        path = os.path.join(EXPORT_DIR, f"usage_data-{uuid.uuid4().hex[:12]}{extension}")
+        with st.spinner("Exporting..."):
+            rows = export_usage_log(path, export_format, info["path"], start_date, end_date)
+        _remove_export()
+        st.session_state.export_file = (path, f"usage_data{extension}", mime, rows)
+
+    if "export_file" in st.session_state:
+        path, file_name, mime, rows = st.session_state.export_file
+        if os.path.exists(path):
+            # Read only when the button is clicked, not on every rerun of the page
+            st.download_button(f"💾 Download {file_name} ({rows} rows)", data=lambda: _read_file(path),
+                               file_name=file_name, mime=mime)
+
+
+def _read_file(path):
+    with open(path, mode="rb") as file:
+        return file.read()
+
+
+def _remove_export():
+    # The session's previous export is replaced by the new one
+    if "export_file" in st.session_state:
+        path = st.session_state.export_file[0]
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def render_model_report(report):
+    # Models and clients are shared by all sessions, so these are per process
+    loaded = [f"{item['kind']} {item['name']}"
+              + (f" ({item['bytes'] / 2**20:.0f} MB)" if item["bytes"] else "")
+              + f", loaded in {item['load_seconds']:.1f} s"
+              for item in report["resources"]]
+    st.caption("Chatbot models: " + ("; ".join(loaded) if loaded else "none loaded yet"))
+    if report["peak_rss_bytes"]:
+        st.caption(f"Peak process memory: {report['peak_rss_bytes'] / 2**20:.0f} MB")
@@ -0,0 +1,135 @@
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from storage.rollups import UsageRollups
+
+
+def _size(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum() if isinstance(value, pd.DataFrame)
+                   else value.memory_usage(deep=True))
+    if isinstance(value, UsageRollups):
+        return sum(_size(table) for table in (value.day_app, value.day_hour, value.app_totals)
+                   if table is not None)
+    if hasattr(value, "to_plotly_json"):
+        # A Plotly figure object is tiny; its traces hold the chart data
+        return sys.getsizeof(value) + _size(value.to_plotly_json())
+    if isinstance(value, np.ndarray):
+        # Object arrays (e.g. string axes) hold pointers; count what they point to
+        return int(pd.Series(value).memory_usage(deep=True, index=False)) if value.dtype == object else value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+# Always on from pandas 3; pandas 2 only has it when enabled
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def _shared(value):
+    # Under pandas Copy-on-Write a shallow copy shares the data, but a write
+    # to it copies first, so callers can never change the cached result.
+    # Without it only a deep copy keeps the cached result safe.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not COPY_ON_WRITE)
+    return value
+
+
+class AggregationCache:
+    """Thread-safe LRU of computed aggregates with an entry and memory cap.
+
+    Keys should include everything the value depends on, typically
+    ``(dataset version, start date, end date, app, aggregate name)``.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _shared(self._entries[key][0])
+            self.misses += 1
+        # Computed outside the lock; two sessions racing on one key both compute it
+        value = compute()
+        size = _size(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+        return _shared(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self._bytes}
+
+
+class UsageAggregates:
+    """The aggregates the dashboard and analytics pages share for one selection.
+
+    ``load_rollups`` and ``load_rows`` return the selection's rollups and raw
+    rows; every result is memoized in ``cache`` under ``key + (name,)``.
+    """
+
+    def __init__(self, load_rollups, load_rows, cache=None, key=()):
+        self._load_rollups = load_rollups
+        self._load_rows = load_rows
+        self._cache = cache if cache is not None else AggregationCache()
+        self._key = tuple(key)
+
+    @classmethod
+    def from_rows(cls, df):
+        return cls(lambda: UsageRollups.from_rows(df), lambda: df)
+
+    def get(self, name, compute):
+        # name: any hashable, e.g. ("daily_chart", max_points) for derived chart data
+        return self._cache.get(self._key + (name,), compute)
+
+    def rollups(self):
+        return self.get("rollups", self._load_rollups)
+
+    def app_totals(self):
+        """``duration`` and ``sessions`` per app, largest total first."""
+        return self.get("app_totals", lambda: self.rollups().app_summary())
+
+    def daily_totals(self):
+        return self.get("daily_totals", lambda: self.rollups().daily_totals())
+
+    def hourly_totals(self):
+        return self.get("hourly_totals", self._hourly_totals)
+
+    def _hourly_totals(self):
+        rollups = self.rollups()
+        if rollups.day_hour is not None:
+            return rollups.hourly_totals()
+        # Hourly rollups span all apps; a single app's rows are few enough to group directly
+        return self._load_rows().groupby("hour")["duration"].sum()
+
+    def total_duration(self):
+        return int(self.app_totals()["duration"].sum())
+
+    def total_sessions(self):
+        return int(self.app_totals()["sessions"].sum())
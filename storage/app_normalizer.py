@@ -0,0 +1,140 @@
+import argparse
+import functools
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+
+RULES_PATH = "data/app_rules.json"
+
+# (pattern, app name) pairs, tried in order against the raw window title.
+# The app name may reference named groups, e.g. "\g<app>".
+DEFAULT_RULES = [
+    (r"[-–—] Google Chrome$", "Google Chrome"),
+    (r"[-–—] Mozilla Firefox$", "Mozilla Firefox"),
+    (r"[-–—] Microsoft\u200b? Edge$", "Microsoft Edge"),
+    (r"[-–—] Opera$", "Opera"),
+    (r"[-–—] Brave$", "Brave"),
+    (r"[-–—] Visual Studio Code$", "Visual Studio Code"),
+    (r"[-–—] Microsoft Visual Studio$", "Visual Studio"),
+    (r"[-–—] PyCharm$|^PyCharm\b", "PyCharm"),
+    (r"[-–—] (?:Microsoft )?Word$|^Word$", "Word"),
+    (r"[-–—] (?:Microsoft )?Excel$|^Excel$", "Excel"),
+    (r"[-–—] (?:Microsoft )?PowerPoint$|^PowerPoint$", "PowerPoint"),
+    (r"[-–—] (?:Microsoft )?Outlook$|^Outlook$", "Outlook"),
+    (r"Microsoft Teams$|^Teams$", "Microsoft Teams"),
+    (r"[-–—] Notepad\+\+$", "Notepad++"),
+    (r"[-–—] (?:Notepad|Not Defteri)$", "Notepad"),
+    (r"^(?:File Explorer|Dosya Gezgini)$|[-–—] (?:File Explorer|Dosya Gezgini)$", "File Explorer"),
+    (r"\bDiscord$", "Discord"),
+    (r"[-–—] Slack$|^Slack\b", "Slack"),
+    (r"^Spotify\b", "Spotify"),
+    (r"\bZoom\b.*Meeting|^Zoom$", "Zoom"),
+    (r"[-–—] Adobe Acrobat(?: Reader)?(?: \(?\w+\)?)?$", "Adobe Acrobat"),
+]
+
+# Fallback for "document - Application" titles not covered by a rule
+GENERIC_SUFFIX_RULE = (r"^.+? [-–—|] (?P<app>[^-–—|]+?)\s*$", r"\g<app>")
+
+
+def load_rules(path=RULES_PATH):
+    """User rules from ``data/app_rules.json`` come before the defaults.
+
+    The file holds a list of ``{"pattern": ..., "app": ...}`` objects.
+    """
+    rules = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            rules = [(rule["pattern"], rule["app"]) for rule in json.load(file)]
+    return rules + DEFAULT_RULES
+
+
+class AppNormalizer:
+    """Maps raw window titles to application names.
+
+    Results are memoized per title in an LRU cache, so steady-state
+    normalization is a dictionary lookup.
+    """
+
+    def __init__(self, rules=None, generic_suffix=True, cache_size=4096):
+        rules = list(DEFAULT_RULES if rules is None else rules)
+        if generic_suffix:
+            rules.append(GENERIC_SUFFIX_RULE)
+        self._rules = [(re.compile(pattern, re.IGNORECASE), app) for pattern, app in rules]
+        self.normalize = functools.lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, title):
+        title = title.strip()
+        for pattern, app in self._rules:
+            match = pattern.search(title)
+            if match:
+                return match.expand(app).strip() or title
+        return title
+
+    def normalize_series(self, titles):
+        # Normalize each distinct title once and broadcast back by code
+        codes, uniques = pd.factorize(titles)
+        mapped = np.array([self.normalize(str(title)) for title in uniques] + [None], dtype=object)
+        return pd.Series(mapped[codes], index=titles.index, name="app_name")
+
+
+def _normalize_csv(path, normalizer):
+    df = pd.read_csv(path)
+    if "window_title" not in df.columns:
+        df["window_title"] = df["app_name"]
+    before = df["app_name"].nunique()
+    df["app_name"] = normalizer.normalize_series(df["window_title"].astype(str))
+    df[["app_name", "duration", "timestamp", "window_title"]].to_csv(f"{path}.tmp", index=False)
+    os.replace(f"{path}.tmp", path)
+    return before, df["app_name"].nunique()
+
+
+def _normalize_binary(path, normalizer):
+    from storage.binary_log import dictionary_path, dump_entry, entry_key, read_app_dictionary
+    keys = [entry_key(entry) for entry in read_app_dictionary(path)]
+    raw_titles = [window_title for window_title, _ in keys]
+    before = len({app_name for _, app_name in keys})
+    apps = [normalizer.normalize(title) for title in raw_titles]
+    # Only the dictionary changes; records keep pointing at the same ids
+    apps_path = dictionary_path(path)
+    with open(f"{apps_path}.tmp", mode="w", encoding="utf-8") as file:
+        for title, app in zip(raw_titles, apps):
+            file.write(dump_entry(title, app) + "\n")
+    os.replace(f"{apps_path}.tmp", apps_path)
+    return before, len(set(apps))
+
+
+def normalize_existing_log(path="data/usage_log.csv", normalizer=None):
+    """Batch pass: rewrite app_name from the raw titles of an existing log.
+
+    Works on a CSV log, a binary log or a partition directory. Raw titles
+    are kept in ``window_title``. Returns (apps before, apps after).
+    """
+    normalizer = normalizer or AppNormalizer(load_rules())
+    if os.path.isdir(path):
+        from storage.partitions import load_manifest
+        manifest = load_manifest(path)
+        files = [os.path.join(path, entry["file"]) for entry in manifest["partitions"].values()] if manifest else []
+    else:
+        files = [path]
+
+    before, after = 0, 0
+    for file_path in files:
+        if file_path.endswith(".bin"):
+            counts = _normalize_binary(file_path, normalizer)
+        else:
+            counts = _normalize_csv(file_path, normalizer)
+        before, after = before + counts[0], after + counts[1]
+    print(f"✅ Normalized {len(files)} file(s): {before} -> {after} distinct app names")
+    return before, after
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize window titles in an existing usage log into app names.")
+    parser.add_argument("path", nargs="?", default="data/usage_log.csv",
+                        help="CSV log, binary log or partition directory")
+    parser.add_argument("--no-generic-suffix", action="store_true",
+                        help="only apply explicit rules, not the 'title - App' fallback")
+    args = parser.parse_args()
+    normalize_existing_log(args.path, AppNormalizer(load_rules(), generic_suffix=not args.no_generic_suffix))
@@ -0,0 +1,218 @@
+import argparse
+import calendar
+import json
+import os
+import numpy as np
+import pandas as pd
+from storage.timestamps import TIMESTAMP_FORMAT
+
+# File layout: 16-byte header, then fixed-width little-endian records.
+# Timestamps are local wall-clock seconds since 1970-01-01 (the same naive
+# times the CSV log stores), so they map straight onto datetime64[s].
+MAGIC = b"PCAL"
+VERSION = 1
+HEADER_SIZE = 16
+RECORD_DTYPE = np.dtype([("timestamp", "<i8"), ("duration", "<i4"), ("app_id", "<i4")])
+
+BINARY_LOG_PATH = "data/usage_log.bin"
+
+
+def dictionary_path(path):
+    # Interned titles, one JSON entry per line; the line number is the app id.
+    # An entry is the window title, or [window title, app name] when they differ.
+    return f"{path}.apps"
+
+
+def _header():
+    return MAGIC + VERSION.to_bytes(2, "little") + RECORD_DTYPE.itemsize.to_bytes(2, "little") + bytes(8)
+
+
+def _check_header(header, path):
+    if len(header) < HEADER_SIZE or header[:4] != MAGIC:
+        raise ValueError(f"{path} is not a usage log binary file")
+    version = int.from_bytes(header[4:6], "little")
+    record_size = int.from_bytes(header[6:8], "little")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: unsupported binary log version {version} (record size {record_size})")
+
+
+def _local_epoch(timestamp):
+    return calendar.timegm(timestamp.timetuple())
+
+
+def read_app_dictionary(path):
+    apps_path = dictionary_path(path)
+    if not os.path.exists(apps_path):
+        return []
+    titles = []
+    with open(apps_path, encoding="utf-8") as file:
+        for line in file:
+            # A torn last line can only belong to a title no record refers to yet
+            if not line.endswith("\n"):
+                break
+            try:
+                titles.append(json.loads(line))
+            except ValueError:
+                # Ids are line numbers, so nothing after a garbled line can be trusted
+                print(f"⚠️ {apps_path}: unreadable entry on line {len(titles) + 1}; ignoring it and later titles")
+                break
+    return titles
+
+
+def _truncate_torn_line(path):
+    # Cut a file back to just after its last newline
+    if not os.path.exists(path):
+        return
+    with open(path, mode="rb+") as file:
+        data = file.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            file.truncate(end)
+
+
+def entry_key(entry):
+    # (window title, app name)
+    return (entry, entry) if isinstance(entry, str) else tuple(entry)
+
+
+def dump_entry(window_title, app_name):
+    entry = window_title if window_title == app_name else [window_title, app_name]
+    return json.dumps(entry, ensure_ascii=False)
+
+
+class BinaryLogSink:
+    """Appends fixed-width records and interns app names in a side dictionary.
+
+    Implements the same sink interface as ``tracker.log_writer.CsvLogSink`` so
+    ``UsageLogWriter`` can group-commit into it.
+    """
+
+    def __init__(self, path=BINARY_LOG_PATH):
+        self.path = path
+        self._file = None
+        self._apps_file = None
+        self._app_ids = {}
+
+    def open(self):
+        # A crash mid-write can leave a torn title; the next one must not be appended onto it
+        _truncate_torn_line(dictionary_path(self.path))
+        self._app_ids = {entry_key(entry): i for i, entry in enumerate(read_app_dictionary(self.path))}
+        self._apps_file = open(dictionary_path(self.path), mode="a", encoding="utf-8")
+        self._file = open(self.path, mode="ab")
+        size = self._file.tell()
+        if size == 0:
+            self._file.write(_header())
+        else:
+            with open(self.path, mode="rb") as file:
+                _check_header(file.read(HEADER_SIZE), self.path)
+            # Drop a torn record left behind by a crash mid-write
+            torn = (size - HEADER_SIZE) % RECORD_DTYPE.itemsize
+            if torn:
+                self._file.truncate(size - torn)
+
+    def _app_id(self, window_title, app_name):
+        key = (window_title, app_name)
+        app_id = self._app_ids.get(key)
+        if app_id is None:
+            app_id = len(self._app_ids)
+            self._app_ids[key] = app_id
+            self._apps_file.write(dump_entry(window_title, app_name) + "\n")
+        return app_id
+
+    def write_rows(self, rows):
+        records = np.empty(len(rows), dtype=RECORD_DTYPE)
+        for i, (app_name, duration, timestamp, *rest) in enumerate(rows):
+            window_title = rest[0] if rest else app_name
+            records[i] = (_local_epoch(timestamp), duration, self._app_id(window_title, app_name))
+        # New titles must reach the dictionary before the records that use them
+        self._apps_file.flush()
+        self._file.write(records.tobytes())
+
+    def flush(self):
+        self._apps_file.flush()
+        self._file.flush()
+
+    def fsync(self):
+        os.fsync(self._apps_file.fileno())
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+        self._apps_file.close()
+        self._file = None
+        self._apps_file = None
+
+
+def read_binary_log(path=BINARY_LOG_PATH):
+    """Memory-map the records of a binary log.
+
+    Returns ``(records, titles)`` where ``records`` is a read-only structured
+    array with ``timestamp``, ``duration`` and ``app_id`` fields and ``titles``
+    maps app ids to dictionary entries.
+    """
+    with open(path, mode="rb") as file:
+        _check_header(file.read(HEADER_SIZE), path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    titles = read_app_dictionary(path)
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE), titles
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+    return records, titles
+
+
+def load_binary_log(path=BINARY_LOG_PATH):
+    return records_to_frame(*read_binary_log(path))
+
+
+def records_to_frame(records, titles):
+    app_ids = np.asarray(records["app_id"])
+    # Records written before their title hit the disk (crash) get dropped
+    valid = app_ids < len(titles)
+    if not valid.all():
+        records = records[valid]
+        app_ids = app_ids[valid]
+    keys = [entry_key(entry) for entry in titles]
+    # Factorize the (small) dictionary, then map record ids through the codes
+    title_codes, title_values = pd.factorize(pd.Series([key[0] for key in keys], dtype=object))
+    app_codes, app_values = pd.factorize(pd.Series([key[1] for key in keys], dtype=object))
+    return pd.DataFrame({
+        "app_name": pd.Categorical.from_codes(app_codes[app_ids], categories=app_values),
+        "duration": np.asarray(records["duration"]),
+        "timestamp": np.asarray(records["timestamp"]).astype("datetime64[s]").astype("datetime64[ns]"),
+        "window_title": pd.Categorical.from_codes(title_codes[app_ids], categories=title_values),
+    })
+
+
+def convert_csv_to_binary(csv_path="data/usage_log.csv", bin_path=BINARY_LOG_PATH):
+    df = pd.read_csv(csv_path)
+    df["duration"] = pd.to_numeric(df["duration"], errors="coerce")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=TIMESTAMP_FORMAT, errors="coerce")
+    df = df.dropna(subset=["app_name", "duration", "timestamp"])
+
+    app_names = df["app_name"].astype(str)
+    window_titles = df["window_title"].fillna(df["app_name"]).astype(str) if "window_title" in df else app_names
+    codes, titles = pd.MultiIndex.from_arrays([window_titles, app_names]).factorize()
+    records = np.empty(len(df), dtype=RECORD_DTYPE)
+    records["timestamp"] = df["timestamp"].to_numpy(dtype="datetime64[s]").astype("int64")
+    records["duration"] = df["duration"].to_numpy().astype("int32")
+    records["app_id"] = codes
+
+    tmp_path = f"{bin_path}.tmp"
+    with open(tmp_path, mode="wb") as file:
+        file.write(_header())
+        file.write(records.tobytes())
+    with open(f"{dictionary_path(bin_path)}.tmp", mode="w", encoding="utf-8") as file:
+        for window_title, app_name in titles:
+            file.write(dump_entry(window_title, app_name) + "\n")
+    os.replace(f"{dictionary_path(bin_path)}.tmp", dictionary_path(bin_path))
+    os.replace(tmp_path, bin_path)
+    print(f"✅ Converted {len(records)} rows ({len(titles)} apps) from {csv_path} to {bin_path}")
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CSV usage log to the binary log format.")
+    parser.add_argument("csv_path", nargs="?", default="data/usage_log.csv")
+    parser.add_argument("bin_path", nargs="?", default=BINARY_LOG_PATH)
+    args = parser.parse_args()
+    convert_csv_to_binary(args.csv_path, args.bin_path)
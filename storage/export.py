@@ -0,0 +1,74 @@
+import gzip
+import os
+import pandas as pd
+from storage.timestamps import TIMESTAMP_FORMAT
+from storage.usage_loader import COLUMNS, _select_range, iter_log_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is only offered when pyarrow is installed
+    pa = None
+    pq = None
+
+# Format name -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    return [name for name in EXPORT_FORMATS if name != "Parquet" or pq is not None]
+
+
+def _export_chunks(source, start_date, end_date, chunk_size):
+    # Only the partitions (or SQLite rows) in the range are read
+    for chunk in iter_log_chunks(source, chunk_size, COLUMNS, start_date, end_date):
+        chunk = _select_range(chunk, start_date, end_date)
+        if chunk.empty:
+            continue
+        if "window_title" not in chunk:
+            chunk["window_title"] = chunk["app_name"]
+        # Plain strings: every chunk interns its own categories
+        yield chunk[COLUMNS].astype({"app_name": str, "window_title": str})
+
+
+def export_usage_log(out_path, export_format="CSV (gzip)", source=None, start_date=None, end_date=None,
+                     chunk_size=200_000):
+    """Write the usage log (optionally one date range of it) to ``out_path``.
+
+    The log is streamed in chunks of ``chunk_size`` rows, so memory stays
+    bounded whatever its size. Returns the number of rows written.
+    """
+    chunks = _export_chunks(source, start_date, end_date, chunk_size)
+    tmp_path = f"{out_path}.tmp"
+    rows = 0
+    if export_format == "Parquet":
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pd.DataFrame(columns=COLUMNS).to_parquet(tmp_path, index=False)
+    else:
+        if export_format == "CSV (gzip)":
+            # Level 6 compresses nearly as well as the default 9 at a fraction of the time
+            file = gzip.open(tmp_path, mode="wt", newline="", encoding="utf-8", compresslevel=6)
+        else:
+            file = open(tmp_path, mode="w", newline="", encoding="utf-8")
+        with file:
+            file.write(",".join(COLUMNS) + "\n")
+            for chunk in chunks:
+                chunk.to_csv(file, header=False, index=False, date_format=TIMESTAMP_FORMAT)
+                rows += len(chunk)
+    os.replace(tmp_path, out_path)
+    return rows
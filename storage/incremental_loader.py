@@ -0,0 +1,444 @@
+import io
+import os
+import threading
+from functools import reduce
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from storage import binary_log, partitions, sidecar, sqlite_store
+from storage.rollups import UsageRollups
+from storage.time_index import UsageIndex, sort_by_timestamp
+from storage.usage_loader import add_derived_columns, empty_frame, read_csv_log, resolve_usage_log
+
+
+def append_frames(df, new_rows):
+    """Concatenate two loaded frames, keeping categorical columns categorical."""
+    if df.empty:
+        return new_rows
+    if new_rows.empty:
+        return df
+    columns = {}
+    for column in df.columns:
+        if column not in new_rows:
+            return pd.concat([df, new_rows], ignore_index=True)
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            columns[column] = union_categoricals([df[column], new_rows[column].astype("category")],
+                                                 ignore_order=True)
+        else:
+            columns[column] = np.concatenate([df[column].to_numpy(), new_rows[column].to_numpy()])
+    return pd.DataFrame(columns)
+
+
+class _BoundedReader(io.RawIOBase):
+    # Exposes only the first ``limit`` bytes of a file to the CSV parser
+    def __init__(self, file, limit):
+        self._file = file
+        self._remaining = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+# Rewrite the Parquet sidecar once this much (and at least a quarter of what
+# it already covers) has been appended since it was written
+SIDECAR_MIN_REFRESH_BYTES = 1024 * 1024
+
+
+def rollups_path(path):
+    return f"{path}.rollups"
+
+
+class _Tail:
+    """Rows of one log file.
+
+    Appended rows are buffered and only joined into ``df`` and ``rollups``
+    when those are read, so a refresh that just picks up new rows costs
+    O(new rows). ``delta`` holds the rows the last refresh appended, or
+    None when it (re)loaded the file. With ``keep_rows=False`` rows are only
+    aggregated into ``rollups`` and ``df`` stays empty.
+    """
+
+    # Join buffered rows once this many appends have piled up
+    MAX_PENDING = 64
+
+    def __init__(self, path, keep_rows=True):
+        self.path = path
+        self.keep_rows = keep_rows
+        self._df = empty_frame()
+        self._rollups = UsageRollups()
+        self._pending = []
+        self._identity = None
+        self.delta = None
+
+    @property
+    def df(self):
+        self._join_pending()
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        if self.keep_rows:
+            self._df = df
+
+    @property
+    def rollups(self):
+        self._join_pending()
+        return self._rollups
+
+    @rollups.setter
+    def rollups(self, rollups):
+        self._rollups = rollups
+
+    def _add_rows(self, new_rows):
+        self._pending.append(new_rows)
+        self.delta = new_rows
+        if len(self._pending) >= self.MAX_PENDING:
+            self._join_pending()
+
+    def _join_pending(self):
+        if not self._pending:
+            return
+        new_rows = reduce(append_frames, self._pending)
+        self._pending = []
+        if self.keep_rows:
+            self._df = append_frames(self._df, new_rows)
+        self._rollups = self._rollups.merge(UsageRollups.from_rows(new_rows))
+
+
+class _CsvTail(_Tail):
+    """Parsed contents of one CSV log up to its last complete line."""
+
+    def __init__(self, path, keep_rows=True):
+        super().__init__(path, keep_rows)
+        self._offset = 0
+        self._header = b""
+        self._last_line = b""
+        self._sidecar_offset = 0
+
+    def _unchanged_prefix(self, file):
+        # The bytes that ended at our offset must still be there; otherwise the
+        # file was rewritten (e.g. by the normalizer) and offsets are meaningless
+        file.seek(self._offset - len(self._last_line))
+        return file.read(len(self._last_line)) == self._last_line
+
+    def refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            had_data = self._identity is not None
+            self.__init__(self.path, self.keep_rows)
+            return had_data
+        identity = (stat.st_dev, stat.st_ino)
+        if stat.st_size == self._offset and identity == self._identity:
+            return False
+
+        with open(self.path, mode="rb") as file:
+            if (identity != self._identity or not self._header or stat.st_size < self._offset
+                    or not self._unchanged_prefix(file)):
+                return self._reload(file, identity, stat.st_size)
+            file.seek(self._offset)
+            chunk = file.read(stat.st_size - self._offset)
+        end = chunk.rfind(b"\n") + 1
+        # Nothing but a torn line (the tracker is mid-write): wait for the rest
+        if end == 0:
+            return False
+        self._append(chunk[:end])
+        self._maybe_write_sidecar()
+        return True
+
+    def _append(self, chunk):
+        self._add_rows(add_derived_columns(read_csv_log(io.BytesIO(self._header + chunk), name=self.path)))
+        self._consumed(chunk)
+
+    def _reload(self, file, identity, size):
+        self.__init__(self.path, self.keep_rows)
+        self._identity = identity
+        file.seek(0)
+        header = file.readline()
+        if not header.endswith(b"\n"):
+            return True
+        self._header = header
+
+        source = sidecar.validate_sidecar(self.path)
+        if source is not None:
+            # Cold start from the columnar sidecar, then parse whatever was appended after it
+            df = sidecar.read_sidecar(self.path)
+            self.df = df
+            # Rollups persisted with the sidecar skip re-aggregating its rows
+            self.rollups = UsageRollups.load(rollups_path(self.path), source) or UsageRollups.from_rows(df)
+            self._seek_to(file, source["offset"])
+            self._sidecar_offset = source["offset"]
+            end = _complete_lines_end(file, size)
+            if end > self._offset:
+                file.seek(self._offset)
+                self._append(file.read(end - self._offset))
+                self.delta = None
+            self._maybe_write_sidecar()
+            return True
+
+        end = _complete_lines_end(file, size)
+        if len(header) < end:
+            # Parse straight from the file, stopping before a torn last line
+            file.seek(0)
+            df = add_derived_columns(read_csv_log(io.BufferedReader(_BoundedReader(file, end)), name=self.path))
+            self.df = df
+            self.rollups = UsageRollups.from_rows(df)
+        self._seek_to(file, end)
+        self._maybe_write_sidecar()
+        return True
+
+    def _seek_to(self, file, offset):
+        self._offset = max(0, offset - 4096)
+        file.seek(self._offset)
+        self._consumed(file.read(offset - self._offset))
+
+    def _maybe_write_sidecar(self):
+        appended = self._offset - self._sidecar_offset
+        # Without the rows there is nothing to write; a loader keeping them does
+        if self.keep_rows and appended >= max(SIDECAR_MIN_REFRESH_BYTES, self._sidecar_offset // 4):
+            source = sidecar.write_sidecar(self.path, self.df, self._offset)
+            if source is not None:
+                self.rollups.save(rollups_path(self.path), source)
+                self._sidecar_offset = self._offset
+
+    def _consumed(self, data):
+        self._offset += len(data)
+        self._last_line = data[data.rfind(b"\n", 0, len(data) - 1) + 1:]
+
+
+def _complete_lines_end(file, size, block=64 * 1024):
+    # Offset just past the last newline in the file (0 if there is none)
+    position = size
+    while position > 0:
+        start = max(0, position - block)
+        file.seek(start)
+        newline = file.read(position - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+class _BinaryTail(_Tail):
+    """Records of one binary log; fixed-width records make torn writes easy to skip."""
+
+    def __init__(self, path, keep_rows=True):
+        super().__init__(path, keep_rows)
+        self._count = 0
+        self._last_record = b""
+
+    def refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            had_data = self._identity is not None
+            self.__init__(self.path, self.keep_rows)
+            return had_data
+        identity = (stat.st_dev, stat.st_ino)
+        count = max(0, stat.st_size - binary_log.HEADER_SIZE) // binary_log.RECORD_DTYPE.itemsize
+        if identity == self._identity and count == self._count:
+            return False
+        reset = identity != self._identity or count < self._count or not self._unchanged_prefix()
+        if reset:
+            self.__init__(self.path, self.keep_rows)
+            self._identity = identity
+
+        records, titles = binary_log.read_binary_log(self.path)
+        self._add_rows(add_derived_columns(binary_log.records_to_frame(records[self._count:count], titles)))
+        if reset:
+            self.delta = None
+        if count:
+            self._last_record = records[count - 1:count].tobytes()
+        self._count = count
+        return True
+
+    def _unchanged_prefix(self):
+        if not self._count:
+            return True
+        record_size = binary_log.RECORD_DTYPE.itemsize
+        with open(self.path, mode="rb") as file:
+            file.seek(binary_log.HEADER_SIZE + (self._count - 1) * record_size)
+            return file.read(record_size) == self._last_record
+
+
+class _SqliteTail(_Tail):
+    """Rows of a SQLite log; ids only grow, so new rows are those past the last id seen."""
+
+    def __init__(self, path, keep_rows=True):
+        super().__init__(path, keep_rows)
+        self._last_id = 0
+
+    def refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            had_data = self._identity is not None
+            self.__init__(self.path, self.keep_rows)
+            return had_data
+        identity = (stat.st_dev, stat.st_ino)
+        with sqlite_store.open_reader(self.path) as conn:
+            last_id = sqlite_store.max_row_id(conn)
+            reset = identity != self._identity or last_id < self._last_id
+            if reset:
+                self.__init__(self.path, self.keep_rows)
+                self._identity = identity
+            if last_id == self._last_id:
+                return reset
+            new_rows = add_derived_columns(sqlite_store.read_rows(conn, "id > ? AND id <= ?",
+                                                                  (self._last_id, last_id)))
+        self._add_rows(new_rows)
+        if reset:
+            self.delta = None
+        self._last_id = last_id
+        return True
+
+
+def _tail_for(path, keep_rows=True):
+    if path.endswith(".bin"):
+        return _BinaryTail(path, keep_rows)
+    if sqlite_store.is_sqlite_log(path):
+        return _SqliteTail(path, keep_rows)
+    return _CsvTail(path, keep_rows)
+
+
+def load_log_file(path):
+    tail = _tail_for(path)
+    tail.refresh()
+    return tail.df
+
+
+class IncrementalUsageLoader:
+    """Keeps the usage log loaded and parses only rows appended since the last refresh.
+
+    Falls back to a full reload of a file when it was truncated, rotated or
+    rewritten. For a partitioned log only the partitions overlapping the
+    requested date range are kept loaded. Returned frames are shared between
+    callers and must be treated as read-only. They are sorted by timestamp,
+    and ``index()`` gives a UsageIndex over the current one. ``rollups``
+    holds the matching day x app, day x hour and app totals, maintained from
+    appended rows only. With ``keep_rows=False`` only the rollups are kept
+    and refresh() returns an empty frame, for callers that never need rows.
+    """
+
+    def __init__(self, path=None, keep_rows=True):
+        self.path = resolve_usage_log(path)
+        self.keep_rows = keep_rows
+        self._tails = {}
+        self._lock = threading.Lock()
+        self._df = None
+        self._range = None
+        self._index = None
+        self.rollups = UsageRollups()
+        # Set when poll() took new rows the frame doesn't include yet
+        self._stale = False
+        # Bumped whenever refresh() returns different data or poll() finds new rows
+        self.version = 0
+
+    def refresh(self, start_date=None, end_date=None):
+        with self._lock:
+            return self._refresh(start_date, end_date)
+
+    def load(self, start_date=None, end_date=None):
+        """Refresh to the given range and return its ``(index, rollups)`` together.
+
+        The loader is shared, and another caller may refresh it to a
+        different range at any moment; reading ``index()`` and ``rollups``
+        after a separate refresh() can then see that range instead.
+        """
+        with self._lock:
+            self._refresh(start_date, end_date)
+            if self._index is None:
+                self._index = UsageIndex(self._df)
+            return self._index, self.rollups
+
+    def _refresh(self, start_date, end_date):
+        if os.path.isdir(self.path):
+            manifest = partitions.load_manifest(self.path)
+            names = partitions.select_partitions(manifest, start_date, end_date) if manifest else []
+            paths = [os.path.join(self.path, name) for name in names]
+        else:
+            paths = [self.path]
+
+        # Drop partitions that fell out of the requested range
+        for path in list(self._tails):
+            if path not in paths:
+                del self._tails[path]
+        changed = (start_date, end_date) != self._range or self._df is None or self._stale
+        for path in paths:
+            if path not in self._tails:
+                self._tails[path] = _tail_for(path, self.keep_rows)
+                changed = True
+            changed = self._tails[path].refresh() or changed
+
+        if changed:
+            df = empty_frame()
+            for path in paths:
+                df = append_frames(df, self._tails[path].df)
+            if start_date is not None:
+                df = df[df["date"] >= start_date]
+            if end_date is not None:
+                df = df[df["date"] <= end_date]
+            self._df = sort_by_timestamp(df.reset_index(drop=True))
+            self._index = None
+            rollups = UsageRollups().merge(*(self._tails[path].rollups for path in paths))
+            self.rollups = rollups.select(start_date, end_date)
+            self._range = (start_date, end_date)
+            self._stale = False
+            self.version += 1
+        return self._df
+
+    def poll(self, version, in_range=True):
+        """Rows appended since ``version`` (an earlier ``self.version``), parsing only those.
+
+        Returns ``(rows, version)``. ``rows`` is None when the data changed in
+        any other way since ``version`` (a refresh by another caller, a
+        rewritten file, the first poll); ``rollups`` is then current as of
+        the returned version. Unlike refresh(), a poll never rebuilds the
+        frame, so it costs O(new rows); the next refresh() catches up.
+        With ``in_range=False`` the rows are not limited to the date range of
+        the last refresh (only to the files it loaded).
+        """
+        with self._lock:
+            if version != self.version or self._df is None:
+                self._refresh(*(self._range or (None, None)))
+                return None, self.version
+            deltas = []
+            for tail in self._tails.values():
+                if tail.refresh():
+                    if tail.delta is None:
+                        self._stale = True
+                        self._refresh(*self._range)
+                        return None, self.version
+                    deltas.append(tail.delta)
+            if not deltas:
+                return empty_frame(), self.version
+            rows = reduce(append_frames, deltas)
+            start_date, end_date = self._range if in_range else (None, None)
+            if start_date is not None:
+                rows = rows[rows["date"] >= start_date]
+            if end_date is not None:
+                rows = rows[rows["date"] <= end_date]
+            self._stale = True
+            self.version += 1
+            return rows, self.version
+
+    def loaded_rollups(self):
+        """Rollups of every loaded file, not limited to the date range of the last refresh."""
+        with self._lock:
+            return UsageRollups().merge(*(tail.rollups for tail in self._tails.values()))
+
+    def index(self):
+        """UsageIndex over the frame the last refresh() returned, built on first use."""
+        with self._lock:
+            if self._index is None and self._df is not None:
+                self._index = UsageIndex(self._df)
+            return self._index
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from storage import partitions, sqlite_store
+from storage.incremental_loader import IncrementalUsageLoader
+from storage.usage_loader import add_derived_columns, empty_frame
+
+# Minimum seconds between two polls of the log, however many sessions tick
+MIN_POLL_INTERVAL = 1.0
+
+
+class LoaderFeed:
+    """New rows of an IncrementalUsageLoader, read with ``poll`` (see there).
+
+    Rows and rollups are not limited to the date range the dashboard last
+    loaded. A partitioned log gets a loader of its own that keeps only the
+    partitions from ``start_date`` on, as the shared one only holds those
+    of the sidebar range.
+    """
+
+    def __init__(self, loader):
+        self._own_loader = os.path.isdir(loader.path)
+        self._loader = IncrementalUsageLoader(loader.path) if self._own_loader else loader
+        self._start_date = None
+        self._names = None
+
+    def _partitions(self, start_date):
+        manifest = partitions.load_manifest(self._loader.path)
+        return partitions.select_partitions(manifest, start_date, None) if manifest else []
+
+    def poll(self, cursor, start_date=None):
+        if self._own_loader:
+            names = self._partitions(start_date)
+            if start_date != self._start_date or names != self._names:
+                # First poll, a new day or a new partition (e.g. today's first rows)
+                self._start_date, self._names = start_date, names
+                self._loader.refresh(start_date)
+                return None, self._loader.version
+        return self._loader.poll(cursor, in_range=False)
+
+    def seed(self, start_date, cursor):
+        # poll() returned None, so the loaded rollups are current as of cursor
+        return self._loader.loaded_rollups().select(start_date)
+
+
+class SqliteFeed:
+    """New rows of a SQLite log by row id, at most ``max_rows`` per poll."""
+
+    def __init__(self, path=sqlite_store.SQLITE_PATH, max_rows=50_000):
+        self.path = path
+        self.max_rows = max_rows
+
+    def poll(self, cursor, start_date=None):
+        # Row ids cover the whole log, so start_date is only needed by seed()
+        with sqlite_store.open_reader(self.path) as conn:
+            last_id = sqlite_store.max_row_id(conn)
+            if cursor is None or last_id < cursor:
+                # First poll, or the log was replaced by a smaller one
+                return None, last_id
+            if last_id == cursor:
+                return empty_frame(), cursor
+            last_id = min(last_id, cursor + self.max_rows)
+            rows = sqlite_store.read_rows(conn, "id > ? AND id <= ?", (cursor, last_id))
+        return add_derived_columns(rows), last_id
+
+    def seed(self, start_date, cursor):
+        # Exactly the rows up to cursor, so the next poll continues where the seed stops
+        return sqlite_store.query_rollups(self.path, start_date, max_id=cursor)
+
+
+class LiveUsage:
+    """Today's totals for the live dashboard, kept current from appended rows only.
+
+    Each ``tick`` polls ``feed`` for the rows logged since the previous one
+    and adds them to today's per-app and hourly totals, so its cost depends
+    on the new rows, not on the size of the log. The state is seeded from
+    rollups on the first tick, at midnight and whenever the feed can't
+    provide a delta. Shared by all sessions; ticks are serialized and
+    throttled to one poll per ``min_interval`` seconds.
+    """
+
+    def __init__(self, feed, min_interval=MIN_POLL_INTERVAL):
+        self._feed = feed
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._cursor = None
+        self._last_poll = 0.0
+        self.day = None
+        self.apps = pd.DataFrame({"duration": pd.Series([], dtype="int64"),
+                                  "sessions": pd.Series([], dtype="int64")})
+        self.hourly = np.zeros(24, dtype="int64")
+        self.yesterday_total = 0
+        # Bumped whenever the totals change
+        self.version = 0
+        self.ticks = 0
+        self.rows = 0
+
+    def tick(self, today=None):
+        """Poll for new rows and fold them in; returns ``snapshot()``."""
+        today = today or date.today()
+        with self._lock:
+            if self.day != today:
+                self._cursor = None
+            if self._cursor is None or time.monotonic() - self._last_poll >= self._min_interval:
+                self._last_poll = time.monotonic()
+                rows, cursor = self._feed.poll(self._cursor, today - timedelta(days=1))
+                if rows is None:
+                    self._seed(today, cursor)
+                elif not rows.empty:
+                    self._add(rows)
+                self._cursor = cursor
+                self.ticks += 1
+            return self.snapshot()
+
+    def _seed(self, today, cursor):
+        rollups = self._feed.seed(today - timedelta(days=1), cursor)
+        self.day = today
+        self.apps = (rollups.on_date(today).set_index("app_name")[["duration", "sessions"]]
+                     .astype("int64"))
+        yesterday = rollups.on_date(today - timedelta(days=1))
+        self.yesterday_total = int(yesterday["duration"].sum())
+        hourly = rollups.day_hour[rollups.day_hour["date"] == today]
+        self.hourly = np.bincount(hourly["hour"].astype("int64"), weights=hourly["duration"],
+                                  minlength=24).astype("int64")
+        self.version += 1
+
+    def _add(self, rows):
+        today_rows = rows[rows["date"] == self.day]
+        if not today_rows.empty:
+            apps = today_rows.groupby("app_name", observed=True)["duration"].agg(["sum", "count"])
+            apps.index = apps.index.astype(object)
+            apps = apps.rename(columns={"sum": "duration", "count": "sessions"})
+            self.apps = self.apps.add(apps, fill_value=0).astype("int64")
+            self.hourly += np.bincount(today_rows["hour"].astype("int64"), weights=today_rows["duration"],
+                                       minlength=24).astype("int64")
+        # Events the tracker flushes just after midnight still belong to yesterday
+        self.yesterday_total += int(rows.loc[rows["date"] == self.day - timedelta(days=1), "duration"].sum())
+        self.rows += len(rows)
+        self.version += 1
+
+    def snapshot(self):
+        return {
+            "day": self.day,
+            "version": self.version,
+            "today_total": int(self.apps["duration"].sum()),
+            "today_sessions": int(self.apps["sessions"].sum()),
+            "yesterday_total": self.yesterday_total,
+            "apps": self.apps.sort_values("duration", ascending=False),
+            "hourly": pd.Series(self.hourly, index=pd.RangeIndex(24, name="hour"), name="duration"),
+        }
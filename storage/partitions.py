@@ -0,0 +1,232 @@
+import argparse
+import calendar
+import json
+import os
+from datetime import date, datetime
+import pandas as pd
+from storage.binary_log import BinaryLogSink
+from storage.timestamps import TIMESTAMP_FORMAT
+from tracker.log_writer import CsvLogSink
+
+PARTITION_DIR = "data/usage_log"
+MANIFEST_NAME = "manifest.json"
+GRANULARITIES = ("day", "month")
+EXTENSIONS = {"csv": ".csv", "binary": ".bin"}
+
+
+def partition_key(timestamp, granularity="day"):
+    return timestamp.strftime('%Y-%m-%d' if granularity == "day" else '%Y-%m')
+
+
+def partition_date_range(key):
+    # A partition key alone bounds the dates it can hold
+    if len(key) == 10:
+        day = date.fromisoformat(key)
+        return day, day
+    year, month = int(key[:4]), int(key[5:7])
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def manifest_path(directory=PARTITION_DIR):
+    return os.path.join(directory, MANIFEST_NAME)
+
+
+def load_manifest(directory=PARTITION_DIR):
+    try:
+        with open(manifest_path(directory), encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(manifest, directory=PARTITION_DIR):
+    path = manifest_path(directory)
+    with open(f"{path}.tmp", mode='w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def is_partitioned(directory=PARTITION_DIR):
+    return os.path.exists(manifest_path(directory))
+
+
+def _read_partition(path):
+    from storage.usage_loader import read_log_file
+    return read_log_file(path)
+
+
+def _partition_entry(file_name, df):
+    return {
+        "file": file_name,
+        "rows": int(len(df)),
+        "min_timestamp": df["timestamp"].min().strftime(TIMESTAMP_FORMAT) if len(df) else None,
+        "max_timestamp": df["timestamp"].max().strftime(TIMESTAMP_FORMAT) if len(df) else None,
+    }
+
+
+def rebuild_manifest(directory=PARTITION_DIR, granularity="day", log_format="csv"):
+    """Rescan the partition files, e.g. after a crash left the manifest behind."""
+    extension = EXTENSIONS[log_format]
+    partitions = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(extension):
+            key = file_name[:-len(extension)]
+            partitions[key] = _partition_entry(file_name, _read_partition(os.path.join(directory, file_name)))
+    manifest = {"granularity": granularity, "format": log_format, "partitions": partitions}
+    save_manifest(manifest, directory)
+    return manifest
+
+
+def select_partitions(manifest, start_date=None, end_date=None):
+    # Prune on the partition key: unlike the recorded bounds it cannot go stale
+    selected = []
+    for key, entry in sorted(manifest["partitions"].items()):
+        first, last = partition_date_range(key)
+        if start_date is not None and last < start_date:
+            continue
+        if end_date is not None and first > end_date:
+            continue
+        selected.append(entry["file"])
+    return selected
+
+
+def get_date_bounds(directory=PARTITION_DIR):
+    manifest = load_manifest(directory)
+    entries = [e for e in manifest["partitions"].values() if e["min_timestamp"]] if manifest else []
+    if not entries:
+        return None, None
+    first = min(e["min_timestamp"] for e in entries)
+    last = max(e["max_timestamp"] for e in entries)
+    return (datetime.strptime(first, TIMESTAMP_FORMAT).date(),
+            datetime.strptime(last, TIMESTAMP_FORMAT).date())
+
+
+def load_partitions(directory=PARTITION_DIR, start_date=None, end_date=None):
+    """Read only the partitions whose time bounds overlap [start_date, end_date].
+
+    Rows outside the range are trimmed, so month partitions return exactly
+    the requested days.
+    """
+    from storage.usage_loader import _select_range, empty_frame
+    manifest = load_manifest(directory)
+    if manifest is None:
+        return empty_frame()
+    frames = [_read_partition(os.path.join(directory, name))
+              for name in select_partitions(manifest, start_date, end_date)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return empty_frame()
+    df = pd.concat(frames, ignore_index=True)
+    # Each partition has its own categories, so concat falls back to object
+    for column in ("app_name", "window_title"):
+        if column in df:
+            df[column] = df[column].astype("category")
+    return _select_range(df, start_date, end_date).reset_index(drop=True)
+
+
+class PartitionedLogSink:
+    """Routes rows into one file per day or month and keeps the manifest current.
+
+    Implements the ``UsageLogWriter`` sink interface. Each partition is a plain
+    CSV or binary log, so it can be read on its own.
+    """
+
+    def __init__(self, directory=PARTITION_DIR, granularity="day", log_format="csv"):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown partition granularity: {granularity!r} (expected one of {GRANULARITIES})")
+        self.directory = directory
+        self.granularity = granularity
+        self.log_format = log_format
+        self._key = None
+        self._sink = None
+        self._manifest = None
+        self._dirty = False
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._manifest = load_manifest(self.directory)
+        if self._manifest is None:
+            self._manifest = rebuild_manifest(self.directory, self.granularity, self.log_format)
+        elif (self._manifest["granularity"], self._manifest["format"]) != (self.granularity, self.log_format):
+            raise ValueError(f"{self.directory} holds {self._manifest['granularity']}/{self._manifest['format']} "
+                             f"partitions, not {self.granularity}/{self.log_format}")
+
+    def _switch_partition(self, key):
+        if self._sink is not None:
+            self._sink.flush()
+            self._sink.close()
+        file_name = key + EXTENSIONS[self.log_format]
+        path = os.path.join(self.directory, file_name)
+        if self.log_format == "binary":
+            self._sink = BinaryLogSink(path)
+        else:
+            self._sink = CsvLogSink(path)
+        self._sink.open()
+        self._key = key
+        self._manifest["partitions"].setdefault(
+            key, {"file": file_name, "rows": 0, "min_timestamp": None, "max_timestamp": None})
+
+    def write_rows(self, rows):
+        batch = []
+        for row in rows:
+            key = partition_key(row[2], self.granularity)
+            if key != self._key:
+                if batch:
+                    self._write_batch(batch)
+                    batch = []
+                self._switch_partition(key)
+            batch.append(row)
+        if batch:
+            self._write_batch(batch)
+
+    def _write_batch(self, rows):
+        self._sink.write_rows(rows)
+        entry = self._manifest["partitions"][self._key]
+        timestamps = [row[2].strftime(TIMESTAMP_FORMAT) for row in rows]
+        entry["rows"] += len(rows)
+        entry["min_timestamp"] = min(timestamps + ([entry["min_timestamp"]] if entry["min_timestamp"] else []))
+        entry["max_timestamp"] = max(timestamps + ([entry["max_timestamp"]] if entry["max_timestamp"] else []))
+        self._dirty = True
+
+    def flush(self):
+        if self._sink is not None:
+            self._sink.flush()
+        # The manifest follows the data, so it never lists rows that are not on disk
+        if self._dirty:
+            save_manifest(self._manifest, self.directory)
+            self._dirty = False
+
+    def fsync(self):
+        if self._sink is not None:
+            self._sink.fsync()
+
+    def close(self):
+        self.flush()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+            self._key = None
+
+
+def partition_existing_log(source_path="data/usage_log.csv", directory=PARTITION_DIR,
+                           granularity="day", log_format="csv"):
+    df = _read_partition(source_path)
+    sink = PartitionedLogSink(directory, granularity, log_format)
+    sink.open()
+    df = df.sort_values("timestamp", kind="stable")
+    window_titles = df["window_title"] if "window_title" in df else df["app_name"]
+    sink.write_rows(list(zip(df["app_name"].astype(str), df["duration"].astype(int),
+                             (ts.to_pydatetime() for ts in df["timestamp"]), window_titles.astype(str))))
+    sink.close()
+    print(f"✅ Wrote {len(df)} rows from {source_path} into {len(load_manifest(directory)['partitions'])} "
+          f"{granularity} partitions under {directory}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split an existing usage log into date partitions.")
+    parser.add_argument("source_path", nargs="?", default="data/usage_log.csv")
+    parser.add_argument("--directory", default=PARTITION_DIR)
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="day")
+    parser.add_argument("--format", dest="log_format", choices=tuple(EXTENSIONS), default="csv")
+    args = parser.parse_args()
+    partition_existing_log(args.source_path, args.directory, args.granularity, args.log_format)
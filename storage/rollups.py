@@ -0,0 +1,132 @@
+import os
+import pickle
+import pandas as pd
+
+ROLLUP_VERSION = 1
+TABLE_KEYS = {
+    "day_app": ["date", "app_name"],
+    "day_hour": ["date", "hour"],
+    "app_totals": ["app_name"],
+}
+
+
+def _empty_table(keys):
+    return pd.DataFrame({**{key: pd.Series([], dtype=object) for key in keys},
+                         "duration": pd.Series([], dtype="int64"),
+                         "sessions": pd.Series([], dtype="int64")})
+
+
+def _aggregate(df, keys):
+    table = df.groupby(keys, observed=True, sort=False)["duration"].agg(["sum", "count"]).reset_index()
+    table = table.rename(columns={"sum": "duration", "count": "sessions"})
+    if "app_name" in keys:
+        # Rollups are small; plain strings avoid category unions on every merge
+        table["app_name"] = table["app_name"].astype(object)
+    return table.astype({"duration": "int64", "sessions": "int64"})
+
+
+def _merge(tables, keys):
+    tables = [table for table in tables if not table.empty]
+    if not tables:
+        return _empty_table(keys)
+    if len(tables) == 1:
+        return tables[0]
+    combined = pd.concat(tables, ignore_index=True)
+    return combined.groupby(keys, sort=False)[["duration", "sessions"]].sum().reset_index()
+
+
+class UsageRollups:
+    """Pre-aggregated usage: day x app, day x hour and app totals.
+
+    Each table holds the summed ``duration`` and the number of logged
+    ``sessions`` (rows) per key. Rollups of new rows are merged in with
+    ``merge``, so keeping them current costs O(new rows), and answering from
+    them costs O(days x apps) instead of O(raw events).
+    """
+
+    def __init__(self, day_app=None, day_hour=None, app_totals=None):
+        self.day_app = _empty_table(TABLE_KEYS["day_app"]) if day_app is None else day_app
+        self.day_hour = _empty_table(TABLE_KEYS["day_hour"]) if day_hour is None else day_hour
+        self.app_totals = _empty_table(TABLE_KEYS["app_totals"]) if app_totals is None else app_totals
+
+    @classmethod
+    def from_rows(cls, df):
+        if df.empty:
+            return cls()
+        return cls(_aggregate(df, TABLE_KEYS["day_app"]),
+                   _aggregate(df, TABLE_KEYS["day_hour"]),
+                   _aggregate(df, TABLE_KEYS["app_totals"]))
+
+    @property
+    def empty(self):
+        return self.day_app.empty
+
+    def merge(self, *others):
+        rollups = [self, *others]
+        return UsageRollups(*(_merge([getattr(r, name) for r in rollups], keys)
+                              for name, keys in TABLE_KEYS.items()))
+
+    def select(self, start_date=None, end_date=None, app_name=None):
+        """Rollups restricted to a date range and/or a single app.
+
+        ``day_hour`` has no app dimension, so it is ``None`` when an app is
+        selected; callers aggregate that app's raw rows instead.
+        """
+        if start_date is None and end_date is None and app_name is None:
+            return self
+        day_app = self.day_app
+        if start_date is not None:
+            day_app = day_app[day_app["date"] >= start_date]
+        if end_date is not None:
+            day_app = day_app[day_app["date"] <= end_date]
+        if app_name is not None:
+            day_app = day_app[day_app["app_name"] == app_name]
+        app_totals = day_app.groupby("app_name", sort=False)[["duration", "sessions"]].sum().reset_index()
+
+        day_hour = self.day_hour
+        if start_date is not None:
+            day_hour = day_hour[day_hour["date"] >= start_date]
+        if end_date is not None:
+            day_hour = day_hour[day_hour["date"] <= end_date]
+        selected = UsageRollups(day_app, day_hour, app_totals)
+        if app_name is not None:
+            selected.day_hour = None
+        return selected
+
+    def total_duration(self):
+        return int(self.app_totals["duration"].sum())
+
+    def total_sessions(self):
+        return int(self.app_totals["sessions"].sum())
+
+    def daily_totals(self):
+        return self.day_app.groupby("date")["duration"].sum().sort_index()
+
+    def hourly_totals(self):
+        return self.day_hour.groupby("hour")["duration"].sum().sort_index()
+
+    def app_summary(self):
+        return self.app_totals.set_index("app_name").sort_values("duration", ascending=False)
+
+    def on_date(self, day):
+        return self.day_app[self.day_app["date"] == day]
+
+    def save(self, path, source):
+        # ``source`` identifies the data these rollups were built from
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, mode="wb") as file:
+            pickle.dump({"version": ROLLUP_VERSION, "source": source,
+                         "tables": {name: getattr(self, name) for name in TABLE_KEYS}}, file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, source):
+        """Persisted rollups, or None if they were built from other data."""
+        try:
+            with open(path, mode="rb") as file:
+                stored = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if stored.get("version") != ROLLUP_VERSION or stored.get("source") != source:
+            return None
+        return cls(**stored["tables"])
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the sidecar is an optimization; without pyarrow every start parses the CSV
+    pa = None
+    pq = None
+
+SIDECAR_VERSION = 1
+METADATA_KEY = b"usage_log_source"
+SAMPLE_BYTES = 64 * 1024
+
+
+def sidecar_path(path):
+    return f"{path}.parquet"
+
+
+def _content_hash(file, offset):
+    # Hash the first and last SAMPLE_BYTES of the covered prefix: enough to
+    # notice a rewritten or replaced log without reading all of it
+    digest = hashlib.sha1()
+    file.seek(0)
+    digest.update(file.read(min(offset, SAMPLE_BYTES)))
+    start = max(0, offset - SAMPLE_BYTES)
+    file.seek(start)
+    digest.update(file.read(offset - start))
+    return digest.hexdigest()
+
+
+def fingerprint(path, offset):
+    """Identity of the first ``offset`` bytes of ``path``."""
+    stat = os.stat(path)
+    with open(path, mode="rb") as file:
+        content_hash = _content_hash(file, offset)
+    return {"version": SIDECAR_VERSION, "offset": offset, "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+
+
+def write_sidecar(path, df, offset):
+    """Atomically store ``df`` (the parse of ``path`` up to ``offset``) as Parquet.
+
+    Returns the fingerprint written, or None if no sidecar was written.
+    """
+    if pq is None or df.empty:
+        return None
+    source = fingerprint(path, offset)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps(source).encode()
+    table = table.replace_schema_metadata(metadata)
+    tmp_path = f"{sidecar_path(path)}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, sidecar_path(path))
+    return source
+
+
+def read_sidecar_fingerprint(path):
+    if pq is None or not os.path.exists(sidecar_path(path)):
+        return None
+    try:
+        metadata = pq.read_schema(sidecar_path(path)).metadata or {}
+        source = json.loads(metadata[METADATA_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        return None
+    return source if source.get("version") == SIDECAR_VERSION else None
+
+
+def validate_sidecar(path):
+    """Return the sidecar's fingerprint if it still describes a prefix of ``path``.
+
+    ``fingerprint["offset"] == os.path.getsize(path)`` means it covers the
+    whole file; a smaller offset means rows were appended since.
+    """
+    source = read_sidecar_fingerprint(path)
+    if source is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if stat.st_size == source["size"] and stat.st_mtime_ns == source["mtime_ns"]:
+        return source
+    if stat.st_size < source["offset"]:
+        return None
+    with open(path, mode="rb") as file:
+        if _content_hash(file, source["offset"]) != source["hash"]:
+            return None
+    return source
+
+
+def read_sidecar(path, columns=None):
+    return pd.read_parquet(sidecar_path(path), columns=columns)
+
+
+def load_fresh_sidecar(path, columns=None):
+    """The sidecar's frame if nothing was appended to ``path`` since it was written."""
+    source = validate_sidecar(path)
+    if source is None:
+        return None
+    stat = os.stat(path)
+    if source["offset"] != stat.st_size and (stat.st_size, stat.st_mtime_ns) != (source["size"], source["mtime_ns"]):
+        return None
+    return read_sidecar(path, columns)
@@ -0,0 +1,229 @@
+import argparse
+import calendar
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+SQLITE_PATH = "data/usage_log.db"
+
+# Timestamps are local wall-clock seconds since 1970-01-01, like the binary
+# log, so days and hours are plain integer arithmetic in SQL
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    window_title TEXT
+);
+CREATE INDEX IF NOT EXISTS usage_timestamp ON usage (timestamp);
+CREATE INDEX IF NOT EXISTS usage_app_timestamp ON usage (app_name, timestamp);
+"""
+EPOCH = date(1970, 1, 1)
+DAY = "timestamp / 86400"
+HOUR = "timestamp % 86400 / 3600"
+
+
+def is_sqlite_log(path):
+    return path.endswith(".db")
+
+
+def connect(path=SQLITE_PATH):
+    conn = sqlite3.connect(path)
+    # WAL lets the dashboard read while the tracker writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def open_reader(path):
+    # Readers open a connection per query: sqlite3 connections are per thread
+    return closing(sqlite3.connect(path))
+
+
+def _day_start(day):
+    return (day - EPOCH).days * 86400
+
+
+def _where(start_date=None, end_date=None, app_name=None, max_id=None):
+    # Conditions the usage_timestamp / usage_app_timestamp indexes can serve
+    conditions, params = [], []
+    if app_name is not None:
+        conditions.append("app_name = ?")
+        params.append(app_name)
+    if start_date is not None:
+        conditions.append("timestamp >= ?")
+        params.append(_day_start(start_date))
+    if end_date is not None:
+        conditions.append("timestamp < ?")
+        params.append(_day_start(end_date + timedelta(days=1)))
+    if max_id is not None:
+        conditions.append("id <= ?")
+        params.append(max_id)
+    return " AND ".join(conditions) or "1", params
+
+
+class SqliteLogSink:
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._conn = None
+
+    def open(self):
+        self._conn = connect(self.path)
+
+    def write_rows(self, rows):
+        self._conn.executemany(
+            "INSERT INTO usage (app_name, duration, timestamp, window_title) VALUES (?, ?, ?, ?)",
+            [(app_name, duration, calendar.timegm(timestamp.timetuple()), rest[0] if rest else app_name)
+             for app_name, duration, timestamp, *rest in rows])
+
+    def flush(self):
+        self._conn.commit()
+
+    def fsync(self):
+        # With synchronous=NORMAL a commit only reaches the WAL; a checkpoint syncs it
+        self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self):
+        self._conn.close()
+        self._conn = None
+
+
+def read_rows(conn, where="1", params=()):
+    df = pd.read_sql_query(f"SELECT app_name, duration, timestamp, window_title FROM usage WHERE {where} ORDER BY id",
+                           conn, params=list(params))
+    return pd.DataFrame({
+        "app_name": df["app_name"].astype("category"),
+        "duration": df["duration"].astype("int32"),
+        "timestamp": df["timestamp"].to_numpy(dtype="int64").astype("datetime64[s]").astype("datetime64[ns]"),
+        "window_title": df["window_title"].fillna(df["app_name"]).astype("category"),
+    })
+
+
+def query_usage(path=SQLITE_PATH, start_date=None, end_date=None, app_name=None):
+    """Raw rows on the given dates (and app), with derived columns."""
+    from storage.usage_loader import add_derived_columns, empty_frame
+    if not os.path.exists(path):
+        return empty_frame()
+    where, params = _where(start_date, end_date, app_name)
+    with open_reader(path) as conn:
+        return add_derived_columns(read_rows(conn, where, params))
+
+
+def max_row_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM usage").fetchone()[0]
+
+
+def iter_chunks(path=SQLITE_PATH, chunk_size=200_000, start_date=None, end_date=None):
+    # Rows in id ranges, so each query is a primary-key range scan; a date
+    # range first narrows the ids to those its timestamp index scan finds
+    if not os.path.exists(path):
+        return
+    where, params = _where(start_date, end_date)
+    with open_reader(path) as conn:
+        first_id, last_id = conn.execute(f"SELECT MIN(id), MAX(id) FROM usage WHERE {where}", params).fetchone()
+        if first_id is None:
+            return
+        for start in range(first_id - 1, last_id, chunk_size):
+            yield read_rows(conn, f"id > ? AND id <= ? AND {where}",
+                            [start, min(start + chunk_size, last_id)] + params)
+
+
+def _dates(days):
+    return np.array([EPOCH + timedelta(days=int(day)) for day in days], dtype=object)
+
+
+def query_rollups(path=SQLITE_PATH, start_date=None, end_date=None, app_name=None, max_id=None):
+    """UsageRollups computed by SQLite; only the aggregated tables reach pandas.
+
+    Unlike in-memory rollups, ``day_hour`` is also available for a single app.
+    ``max_id`` leaves out rows inserted after that row id.
+    """
+    from storage.rollups import UsageRollups
+    if not os.path.exists(path):
+        return UsageRollups()
+    where, params = _where(start_date, end_date, app_name, max_id)
+    totals = "SUM(duration) AS duration, COUNT(*) AS sessions"
+    with open_reader(path) as conn:
+        day_app = pd.read_sql_query(f"SELECT {DAY} AS date, app_name, {totals} FROM usage WHERE {where} "
+                                    f"GROUP BY date, app_name", conn, params=params)
+        day_hour = pd.read_sql_query(f"SELECT {DAY} AS date, {HOUR} AS hour, {totals} FROM usage WHERE {where} "
+                                     f"GROUP BY date, hour", conn, params=params)
+        app_totals = pd.read_sql_query(f"SELECT app_name, {totals} FROM usage WHERE {where} "
+                                       f"GROUP BY app_name", conn, params=params)
+    day_app["date"] = _dates(day_app["date"])
+    day_hour["date"] = _dates(day_hour["date"])
+    day_hour["hour"] = day_hour["hour"].astype("int8")
+    return UsageRollups(*(table.astype({"duration": "int64", "sessions": "int64"})
+                          for table in (day_app, day_hour, app_totals)))
+
+
+def get_date_bounds(path=SQLITE_PATH):
+    if not os.path.exists(path):
+        return None, None
+    with open_reader(path) as conn:
+        # Separate subqueries: SQLite only answers a lone MIN or MAX from the index
+        first, last = conn.execute("SELECT (SELECT MIN(timestamp) FROM usage), "
+                                   "(SELECT MAX(timestamp) FROM usage)").fetchone()
+    if first is None:
+        return None, None
+    return EPOCH + timedelta(days=first // 86400), EPOCH + timedelta(days=last // 86400)
+
+
+def count_apps(path=SQLITE_PATH):
+    # Served from the usage_app_timestamp index
+    if not os.path.exists(path):
+        return 0
+    with open_reader(path) as conn:
+        return conn.execute("SELECT COUNT(DISTINCT app_name) FROM usage").fetchone()[0]
+
+
+def list_apps(path=SQLITE_PATH, start_date=None, end_date=None):
+    if not os.path.exists(path):
+        return []
+    where, params = _where(start_date, end_date)
+    with open_reader(path) as conn:
+        rows = conn.execute(f"SELECT DISTINCT app_name FROM usage WHERE {where} ORDER BY app_name", params)
+        return [app_name for app_name, in rows]
+
+
+def migrate_log(source="data/usage_log.csv", db_path=SQLITE_PATH, chunk_size=200_000):
+    """Copy an existing CSV log, binary log or partition directory into SQLite."""
+    from storage.usage_loader import COLUMNS, iter_log_chunks
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with closing(connect(db_path)) as conn:
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM usage)").fetchone()[0]:
+            print(f"❌ {db_path} already holds usage rows; migrate into an empty database")
+            return 0
+        # Bulk load into the bare table and build the indexes once at the end
+        conn.execute("DROP INDEX usage_timestamp")
+        conn.execute("DROP INDEX usage_app_timestamp")
+        rows = 0
+        for chunk in iter_log_chunks(source, chunk_size, columns=COLUMNS):
+            app_names = chunk["app_name"].astype(str)
+            window_titles = (chunk["window_title"].astype(object).fillna(app_names)
+                             if "window_title" in chunk else app_names)
+            timestamps = chunk["timestamp"].to_numpy(dtype="datetime64[s]").astype("int64")
+            conn.executemany(
+                "INSERT INTO usage (app_name, duration, timestamp, window_title) VALUES (?, ?, ?, ?)",
+                zip(app_names, chunk["duration"].astype(int).tolist(), timestamps.tolist(), window_titles))
+            rows += len(chunk)
+        conn.executescript(SCHEMA)
+        conn.commit()
+    print(f"✅ Migrated {rows} rows from {source} to {db_path}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy an existing usage log into the SQLite store.")
+    parser.add_argument("source", nargs="?", default="data/usage_log.csv",
+                        help="CSV log, binary log or partition directory")
+    parser.add_argument("db_path", nargs="?", default=SQLITE_PATH)
+    args = parser.parse_args()
+    migrate_log(args.source, args.db_path)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+
+def sort_by_timestamp(df):
+    # Logs are appended in time order, so this is normally just the O(n) check
+    if df["timestamp"].is_monotonic_increasing:
+        return df
+    return df.sort_values("timestamp", kind="stable", ignore_index=True)
+
+
+class UsageIndex:
+    """Binary-search index over a loaded frame sorted by timestamp.
+
+    Date ranges are ``searchsorted`` slices of the int64 epoch column. Row
+    positions are also kept grouped by app, as one sorted array of
+    ``app code * len(df) + position`` keys, so the apps present in a range
+    and one app's rows in a range are found without scanning the frame.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.epochs = df["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+        self._rows = len(df)
+        self._apps = df["app_name"].cat.categories
+        self._app_order = np.argsort(self._apps.to_numpy(dtype=object))
+        self._sorted_names = self._apps.to_numpy(dtype=object)[self._app_order]
+        self._codes = df["app_name"].cat.codes.to_numpy()
+        # A stable sort keeps each app's positions ascending
+        positions = np.argsort(self._codes, kind="stable")
+        self._keys = self._codes[positions].astype("int64") * self._rows + positions
+
+    def row_range(self, start_date=None, end_date=None):
+        start = 0 if start_date is None else int(np.searchsorted(self.epochs, pd.Timestamp(start_date).value))
+        end = self._rows
+        if end_date is not None:
+            end = int(np.searchsorted(self.epochs, (pd.Timestamp(end_date) + pd.Timedelta(days=1)).value))
+        return start, max(start, end)
+
+    def app_names(self, start_date=None, end_date=None):
+        """Sorted names of the apps with rows on the given dates."""
+        start, end = self.row_range(start_date, end_date)
+        if end - start < 64 * len(self._apps):
+            # Short ranges: counting the codes in the slice is cheaper than two searches per app
+            present = np.bincount(self._codes[start:end], minlength=len(self._apps)) > 0
+        else:
+            base = np.arange(len(self._apps), dtype="int64") * self._rows
+            present = np.searchsorted(self._keys, base + start) < np.searchsorted(self._keys, base + end)
+        return self._sorted_names[present[self._app_order]].tolist()
+
+    def select(self, start_date=None, end_date=None, app_name=None):
+        start, end = self.row_range(start_date, end_date)
+        if app_name is None:
+            return self.df.iloc[start:end]
+        if app_name not in self._apps:
+            return self.df.iloc[0:0]
+        base = self._apps.get_loc(app_name) * self._rows
+        low, high = np.searchsorted(self._keys, [base + start, base + end])
+        return self.df.take(self._keys[low:high] - base)
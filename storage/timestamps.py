@@ -0,0 +1,2 @@
+# How timestamps are written in the CSV log, partition manifests and the tracker's journal
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
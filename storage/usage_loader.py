@@ -0,0 +1,158 @@
+import os
+import numpy as np
+import pandas as pd
+from storage import binary_log, partitions, sidecar, sqlite_store
+from storage.timestamps import TIMESTAMP_FORMAT
+
+USAGE_LOG_PATH = "data/usage_log.csv"
+COLUMNS = ["app_name", "duration", "timestamp", "window_title"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def resolve_usage_log(path=None):
+    """The log to read when no path is given: partitions, then binary, then SQLite, then CSV."""
+    if path is not None:
+        return path
+    if partitions.is_partitioned(partitions.PARTITION_DIR):
+        return partitions.PARTITION_DIR
+    if os.path.exists(binary_log.BINARY_LOG_PATH):
+        return binary_log.BINARY_LOG_PATH
+    if os.path.exists(sqlite_store.SQLITE_PATH):
+        return sqlite_store.SQLITE_PATH
+    return USAGE_LOG_PATH
+
+
+def log_size(path):
+    """Bytes on disk of a log; for a partitioned log, only its partition files count."""
+    if os.path.isdir(path):
+        # Their Parquet and rollup sidecars are caches, not log data
+        manifest = partitions.load_manifest(path) or {"partitions": {}}
+        return sum(log_size(os.path.join(path, entry["file"])) for entry in manifest["partitions"].values())
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def empty_frame():
+    return add_derived_columns(pd.DataFrame({
+        "app_name": pd.Categorical([]),
+        "duration": pd.Series([], dtype="int32"),
+        "timestamp": pd.Series([], dtype="datetime64[ns]"),
+    }))
+
+
+def read_csv_log(path, name=None):
+    df = pd.read_csv(path, dtype={"app_name": "category", "window_title": "category", "timestamp": str},
+                     usecols=lambda column: column in COLUMNS, on_bad_lines="skip")
+    return _drop_bad_rows(df, name or path)
+
+
+def _drop_bad_rows(df, name):
+    # A malformed duration anywhere turns the whole column into text
+    if not pd.api.types.is_numeric_dtype(df["duration"]):
+        df["duration"] = pd.to_numeric(df["duration"], errors="coerce")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=TIMESTAMP_FORMAT, errors="coerce")
+
+    # Bad-row policy: drop rows without an app name, a numeric non-negative
+    # duration or a timestamp in TIMESTAMP_FORMAT
+    valid = df["app_name"].notna() & (df["duration"] >= 0) & df["timestamp"].notna()
+    dropped = len(df) - int(valid.sum())
+    if dropped:
+        print(f"⚠️ Skipped {dropped} malformed rows in {name}")
+        df = df[valid]
+        df["app_name"] = df["app_name"].cat.remove_unused_categories()
+    df["duration"] = df["duration"].astype("int32")
+    return df.reset_index(drop=True)
+
+
+def iter_log_chunks(path=None, chunk_size=200_000, columns=("app_name", "duration", "timestamp"),
+                    start_date=None, end_date=None):
+    """Yield the log as frames of at most ``chunk_size`` rows.
+
+    CSV logs only read ``columns`` (``app_name``, ``duration`` and
+    ``timestamp`` are always needed for the same bad-row policy as
+    ``read_csv_log``); memory stays bounded by the chunk size. A date range
+    skips the partitions (or, in SQLite, the rows) outside it; other chunks
+    may still hold rows outside the range.
+    """
+    path = resolve_usage_log(path)
+    if os.path.isdir(path):
+        manifest = partitions.load_manifest(path)
+        for name in partitions.select_partitions(manifest, start_date, end_date) if manifest else []:
+            yield from iter_log_chunks(os.path.join(path, name), chunk_size, columns)
+    elif sqlite_store.is_sqlite_log(path):
+        yield from sqlite_store.iter_chunks(path, chunk_size, start_date, end_date)
+    elif path.endswith(".bin"):
+        records, titles = binary_log.read_binary_log(path)
+        for start in range(0, len(records), chunk_size):
+            yield binary_log.records_to_frame(records[start:start + chunk_size], titles)
+    else:
+        reader = pd.read_csv(path, dtype={"app_name": "category", "window_title": "category", "timestamp": str},
+                             usecols=lambda column: column in columns, on_bad_lines="skip",
+                             chunksize=chunk_size)
+        with reader:
+            for chunk in reader:
+                yield _drop_bad_rows(chunk, path)
+
+
+def read_log_file(path):
+    """One log file with derived columns; CSV logs are read through their Parquet sidecar."""
+    from storage.incremental_loader import load_log_file
+    return load_log_file(path)
+
+
+def add_derived_columns(df):
+    # Build one datetime.date per distinct day and broadcast it, instead of one per row
+    day_codes, days = pd.factorize(df["timestamp"].to_numpy().astype("datetime64[D]"))
+    dates = np.array([day.date() for day in pd.DatetimeIndex(days)] + [None], dtype=object)
+    df["date"] = dates[day_codes]
+    df["hour"] = df["timestamp"].dt.hour.astype("int8")
+    df["weekday"] = pd.Categorical.from_codes(df["timestamp"].dt.dayofweek.to_numpy(), categories=WEEKDAYS)
+    return df
+
+
+def _select_range(df, start_date, end_date):
+    if start_date is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(start_date)]
+    if end_date is not None:
+        df = df[df["timestamp"] < pd.Timestamp(end_date) + pd.Timedelta(days=1)]
+    return df
+
+
+def load_usage_data(path=None, start_date=None, end_date=None, columns=None):
+    """Load the usage log as a typed frame shared by the app, chatbot and CLI.
+
+    Columns: ``app_name`` (category), ``duration`` (int32 seconds),
+    ``timestamp`` (datetime64), optional ``window_title`` (category) and the
+    derived ``date``, ``hour`` and ``weekday`` columns. With a date range only
+    rows on those dates are returned; partitioned logs only open the
+    partitions that overlap it and SQLite logs only read those rows. ``columns`` limits the result to those
+    columns; with a fresh sidecar only they are read from disk.
+    """
+    path = resolve_usage_log(path)
+    try:
+        if columns is not None and os.path.isfile(path) and not path.endswith(".bin"):
+            needed = list(columns) + ["timestamp"] * (start_date is not None or end_date is not None)
+            df = sidecar.load_fresh_sidecar(path, columns=list(dict.fromkeys(needed)))
+            if df is not None:
+                return _select_range(df, start_date, end_date)[list(columns)].reset_index(drop=True)
+
+        if os.path.isdir(path):
+            df = partitions.load_partitions(path, start_date, end_date)
+        elif sqlite_store.is_sqlite_log(path):
+            # The date range becomes an indexed range scan
+            df = sqlite_store.query_usage(path, start_date, end_date)
+        elif os.path.exists(path):
+            df = _select_range(read_log_file(path), start_date, end_date)
+        else:
+            return empty_frame()
+
+        # Partitions and binary logs each intern their own categories
+        for column in ("app_name", "window_title"):
+            if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype("category")
+        df = df.reset_index(drop=True)
+        if "date" not in df:
+            df = add_derived_columns(df)
+        return df if columns is None else df[list(columns)]
+    except Exception as e:
+        print(f"❌ Error loading usage data from {path}: {e}")
+        return empty_frame()
@@ -0,0 +1,200 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from storage.timestamps import TIMESTAMP_FORMAT
+
+CSV_HEADER = ['app_name', 'duration', 'timestamp', 'window_title']
+
+# fsync after every group commit / only when the writer is closed / never
+FSYNC_POLICIES = ("commit", "close", "never")
+LOG_FORMATS = ("csv", "binary", "sqlite")
+
+
+class CsvLogSink:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._writer = None
+        self._columns = len(CSV_HEADER)
+
+    def open(self):
+        self._file = open(self.path, mode='a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        if self._file.tell() == 0:
+            self._writer.writerow(CSV_HEADER)
+            self._columns = len(CSV_HEADER)
+        else:
+            with open(self.path, newline='', encoding='utf-8') as file:
+                self._columns = len(next(csv.reader(file), CSV_HEADER))
+            if self._columns < len(CSV_HEADER):
+                print(f"ℹ️ {self.path} has no window_title column; logging raw titles as app_name. "
+                      f"Run 'python -m storage.app_normalizer {self.path}' to migrate it.")
+
+    def write_rows(self, rows):
+        if self._columns < len(CSV_HEADER):
+            # Logs from before window_title was recorded keep raw titles, so the
+            # batch normalizer can still migrate them later
+            self._writer.writerows(
+                [rest[0] if rest else app_name, duration, timestamp.strftime(TIMESTAMP_FORMAT)]
+                for app_name, duration, timestamp, *rest in rows)
+            return
+        self._writer.writerows(
+            [app_name, duration, timestamp.strftime(TIMESTAMP_FORMAT), rest[0] if rest else app_name]
+            for app_name, duration, timestamp, *rest in rows)
+
+    def flush(self):
+        self._file.flush()
+
+    def fsync(self):
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+        self._file = None
+        self._writer = None
+
+
+class UsageLogWriter:
+    """Long-lived, write-behind appender for the usage log.
+
+    Rows are queued in memory and written in one go when the queue reaches
+    ``max_batch_size`` rows or ``flush_interval`` seconds have passed since the
+    last commit. The span that is still being timed is checkpointed into a small
+    journal at every commit, so a killed tracker loses at most one flush interval.
+    """
+
+    def __init__(self, path='data/usage_log.csv', max_batch_size=50, flush_interval=30.0,
+                 fsync_policy="commit", log_format="csv", partitioning=None, normalizer=None,
+                 journal_path=None, clock=time.monotonic):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy!r} (expected one of {FSYNC_POLICIES})")
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format: {log_format!r} (expected one of {LOG_FORMATS})")
+        self.path = path
+        self.journal_path = journal_path or f"{path}.journal"
+        if partitioning and log_format == "sqlite":
+            raise ValueError("SQLite logs are not partitioned; their timestamp index already prunes by date")
+        if partitioning:
+            # path is the partition directory
+            from storage.partitions import PartitionedLogSink
+            self._sink = PartitionedLogSink(path, granularity=partitioning, log_format=log_format)
+        elif log_format == "binary":
+            from storage.binary_log import BinaryLogSink
+            self._sink = BinaryLogSink(path)
+        elif log_format == "sqlite":
+            from storage.sqlite_store import SqliteLogSink
+            self._sink = SqliteLogSink(path)
+        else:
+            self._sink = CsvLogSink(path)
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self.normalizer = normalizer
+        self._clock = clock
+
+        self._queue = []
+        self._span = None
+        self._journaled_span = None
+        self._opened = False
+        self._last_commit = clock()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._sink.open()
+        self._opened = True
+        self._recover_journal()
+        self._last_commit = self._clock()
+
+    def _app_name(self, window_title):
+        return self.normalizer.normalize(window_title) if self.normalizer else window_title
+
+    def append(self, window_title, duration, timestamp=None):
+        if timestamp is None:
+            timestamp = datetime.now()
+        # The appended row ends the span being timed; journaling it as well
+        # would make recovery write the span twice
+        if self._span and self._span[0] == window_title:
+            self._span = None
+        self._queue.append((self._app_name(window_title), duration, timestamp, window_title))
+        if len(self._queue) >= self.max_batch_size:
+            self.commit()
+        else:
+            self.maybe_commit()
+
+    def checkpoint(self, window_title, active_time):
+        # Remember the span that is still running; it is journaled on the next commit.
+        self._span = [window_title, active_time] if window_title else None
+        self.maybe_commit()
+
+    def maybe_commit(self):
+        if self._clock() - self._last_commit >= self.flush_interval:
+            self.commit()
+
+    def commit(self):
+        # Journal first: a crash between the two writes can then only drop
+        # queued rows, never record the same span twice.
+        self._write_journal()
+        if self._queue:
+            self._sink.write_rows(self._queue)
+            self._queue.clear()
+            self._sink.flush()
+            if self.fsync_policy == "commit":
+                self._sink.fsync()
+        self._last_commit = self._clock()
+
+    def close(self):
+        if not self._opened:
+            return
+        self._span = None
+        self.commit()
+        if self.fsync_policy == "close":
+            self._sink.fsync()
+        self._sink.close()
+        self._opened = False
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _write_journal(self):
+        if self._span == self._journaled_span:
+            return
+        if self._span is None:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        else:
+            title, active_time = self._span
+            entry = {"app_name": self._app_name(title), "duration": active_time,
+                     "timestamp": datetime.now().strftime(TIMESTAMP_FORMAT), "window_title": title}
+            tmp_path = f"{self.journal_path}.tmp"
+            with open(tmp_path, mode='w', encoding='utf-8') as file:
+                json.dump(entry, file)
+                file.flush()
+                if self.fsync_policy != "never":
+                    os.fsync(file.fileno())
+            os.replace(tmp_path, self.journal_path)
+        self._journaled_span = list(self._span) if self._span else None
+
+    def _recover_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        try:
+            with open(self.journal_path, encoding='utf-8') as file:
+                entry = json.load(file)
+            timestamp = datetime.strptime(entry["timestamp"], TIMESTAMP_FORMAT)
+            window_title = entry.get("window_title", entry["app_name"])
+            self._sink.write_rows([(entry["app_name"], int(entry["duration"]), timestamp, window_title)])
+            self._sink.flush()
+            print(f"♻️ Recovered unfinished span '{entry['app_name']}' ({entry['duration']}s) from journal.")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Ignoring unreadable journal {self.journal_path}: {e}")
+        os.remove(self.journal_path)
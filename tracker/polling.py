@@ -0,0 +1,36 @@
+class AdaptivePoller:
+    """Chooses how long the tracker sleeps before the next sample.
+
+    Sampling starts at ``min_interval`` and backs off by ``backoff`` once the
+    title has been stable for ``stable_polls`` samples, up to ``max_interval``.
+    While the user has been idle for ``idle_threshold`` seconds it sleeps at
+    least ``idle_interval``. Any title change, idle or not, snaps back to
+    ``min_interval``. A window shown for less than the current interval can be
+    missed entirely, which bounds how far either cap should go.
+    """
+
+    def __init__(self, min_interval=1.0, max_interval=2.0, backoff=1.5, stable_polls=5,
+                 idle_threshold=60.0, idle_interval=5.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stable_polls = stable_polls
+        self.idle_threshold = idle_threshold
+        self.idle_interval = idle_interval
+
+        self.interval = min_interval
+        self._stable = 0
+
+    def next_interval(self, changed, idle_seconds=0.0):
+        if changed:
+            # Re-sample quickly: the user may be switching through several windows
+            self._stable = 0
+            self.interval = self.min_interval
+            return self.interval
+        self._stable += 1
+        if self._stable >= self.stable_polls:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+        if idle_seconds >= self.idle_threshold:
+            return max(self.interval, self.idle_interval)
+        return self.interval
@@ -0,0 +1,73 @@
+class WindowSource:
+    """Where the tracker reads the foreground window title from.
+
+    ``get_active_window_title`` returns ``None`` once the source has nothing
+    more to report, which ends the tracking loop.
+    """
+
+    def get_active_window_title(self):
+        raise NotImplementedError
+
+    def get_idle_seconds(self):
+        return 0.0
+
+
+class Win32WindowSource(WindowSource):
+    def __init__(self):
+        import win32api
+        import win32gui
+        self._win32api = win32api
+        self._win32gui = win32gui
+
+    def get_active_window_title(self):
+        window = self._win32gui.GetForegroundWindow()
+        return self._win32gui.GetWindowText(window)
+
+    def get_idle_seconds(self):
+        # Both values are GetTickCount() milliseconds, which wrap every ~49.7 days
+        idle_ms = (self._win32api.GetTickCount() - self._win32api.GetLastInputInfo()) & 0xFFFFFFFF
+        return idle_ms / 1000
+
+
+class ScriptedWindowSource(WindowSource):
+    """Replays a fixed sequence of windows on a virtual clock.
+
+    ``steps`` is a list of ``(title, seconds)`` or ``(title, seconds, idle)``
+    tuples; an idle step reports no user input since it started. Pass
+    ``source.clock`` and ``source.sleep`` to the tracker so that runs are
+    instant and deterministic on any platform.
+    """
+
+    def __init__(self, steps):
+        self._steps = []
+        start = 0.0
+        for step in steps:
+            title, seconds = step[0], step[1]
+            idle = step[2] if len(step) > 2 else False
+            self._steps.append((start, start + seconds, title, idle))
+            start += seconds
+        self._now = 0.0
+        self.wakeups = 0
+
+    def clock(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self.wakeups += 1
+        self._now += seconds
+
+    def _current_step(self):
+        for step in self._steps:
+            if step[0] <= self._now < step[1]:
+                return step
+        return None
+
+    def get_active_window_title(self):
+        step = self._current_step()
+        return step[2] if step else None
+
+    def get_idle_seconds(self):
+        step = self._current_step()
+        if step and step[3]:
+            return self._now - step[0]
+        return 0.0
@@ -1,14 +1,143 @@
-import pandas as pd
 import streamlit as st
+from storage import partitions, sqlite_store
+from storage.aggregates import AggregationCache, UsageAggregates
+from storage.incremental_loader import IncrementalUsageLoader
+from storage.live import LiveUsage, LoaderFeed, SqliteFeed
+from storage.usage_loader import log_size
 
-@st.cache_data
-def load_usage_data():
-    try:
-        df = pd.read_csv("data/usage_log.csv")
-        df["duration"] = df["duration"].astype(int)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df["date"] = df["timestamp"].dt.date
-        df["hour"] = df["timestamp"].dt.hour
-        return df
-    except:
-        return pd.DataFrame()
\ No newline at end of file
+@st.cache_resource
+def get_usage_loader():
+    return IncrementalUsageLoader()
+
+
+@st.cache_resource
+def get_aggregation_cache():
+    # Shared by every session and rerun; entries are keyed by dataset version
+    return AggregationCache()
+
+
+@st.cache_resource
+def get_live_usage():
+    # One process-wide feed, so live sessions share each poll of the log
+    path = _sqlite_path()
+    return LiveUsage(SqliteFeed(path) if path else LoaderFeed(get_usage_loader()))
+
+
+def _sqlite_path():
+    # With a SQLite log, sidebar filters become indexed SQL queries
+    path = get_usage_loader().path
+    return path if sqlite_store.is_sqlite_log(path) else None
+
+
+def _app_filter(app_name):
+    return None if app_name == "All Apps" else app_name
+
+
+def load_usage_data(start_date=None, end_date=None):
+    # Each call picks up rows the tracker appended since the last one; the
+    # returned frame is shared across sessions, so don't modify it in place
+    return get_usage_loader().refresh(start_date, end_date)
+
+
+def get_date_bounds():
+    # Partitioned logs answer from the manifest without reading any rows
+    if partitions.is_partitioned():
+        return partitions.get_date_bounds()
+    if _sqlite_path():
+        return sqlite_store.get_date_bounds(_sqlite_path())
+    df = load_usage_data()
+    if df.empty:
+        return None, None
+    # The loaded frame is sorted by timestamp
+    return df["date"].iloc[0], df["date"].iloc[-1]
+
+
+def _load_range(start_date, end_date):
+    # The index and rollups of one refresh, taken together: other sessions
+    # refresh the shared loader to their own ranges at any time. Only a
+    # partitioned log can skip rows on disk; a single file is loaded once.
+    if partitions.is_partitioned():
+        return get_usage_loader().load(start_date, end_date)
+    return get_usage_loader().load()
+
+
+def list_app_names(start_date, end_date):
+    if _sqlite_path():
+        return sqlite_store.list_apps(_sqlite_path(), start_date, end_date)
+    index, _ = _load_range(start_date, end_date)
+    return index.app_names(start_date, end_date)
+
+
+def load_filtered_usage_data(start_date, end_date, app_name=None):
+    app_name = _app_filter(app_name)
+    if _sqlite_path():
+        return sqlite_store.query_usage(_sqlite_path(), start_date, end_date, app_name)
+    # Binary-search slices of the sorted frame instead of masks over every row
+    index, _ = _load_range(start_date, end_date)
+    return index.select(start_date, end_date, app_name)
+
+
+def load_usage_rollups(start_date, end_date, app_name=None):
+    # Pre-aggregated totals for the range
+    if _sqlite_path():
+        return sqlite_store.query_rollups(_sqlite_path(), start_date, end_date, _app_filter(app_name))
+    _, rollups = _load_range(start_date, end_date)
+    return rollups.select(start_date, end_date, _app_filter(app_name))
+
+
+def dataset_version():
+    if _sqlite_path():
+        with sqlite_store.open_reader(_sqlite_path()) as conn:
+            return sqlite_store.max_row_id(conn)
+    return get_usage_loader().version
+
+
+def load_usage_aggregates(start_date, end_date, app_name=None, version=None):
+    app_name = _app_filter(app_name)
+    if version is None:
+        version = dataset_version()
+    if _sqlite_path():
+        load_rollups = lambda: load_usage_rollups(start_date, end_date, app_name)
+    else:
+        # Taken now rather than at render time: selecting them from the loaded
+        # rollups is cheap, and the loader may hold another range by then
+        rollups = load_usage_rollups(start_date, end_date, app_name)
+        load_rollups = lambda: rollups
+    return UsageAggregates(load_rollups,
+                           lambda: load_filtered_usage_data(start_date, end_date, app_name),
+                           get_aggregation_cache(), key=(version, start_date, end_date, app_name))
+
+
+def load_page_data(start_date, end_date, app_name, version):
+    """Aggregates for the sidebar selection, kept in session state.
+
+    Page switches and in-page widgets rerun only the page fragment, which
+    reuses them without touching the log until the selection or version changes.
+    Raw rows are only loaded if an aggregate needs them.
+    """
+    key = (start_date, end_date, app_name, version)
+    cached = st.session_state.get("page_data")
+    if cached is None or cached[0] != key:
+        cached = (key, load_usage_aggregates(start_date, end_date, app_name, version))
+        st.session_state.page_data = cached
+    return cached[1]
+
+
+def get_dataset_info():
+    """Row count, date bounds, app count and size of the log, without scanning its rows."""
+    path = get_usage_loader().path
+    if _sqlite_path():
+        with sqlite_store.open_reader(path) as conn:
+            rows = sqlite_store.max_row_id(conn)
+        apps = sqlite_store.count_apps(path)
+    elif partitions.is_partitioned():
+        manifest = partitions.load_manifest()
+        rows = sum(entry["rows"] for entry in manifest["partitions"].values())
+        apps = None
+    else:
+        index, rollups = get_usage_loader().load()
+        rows = len(index.df)
+        apps = len(rollups.app_totals)
+    first_date, last_date = get_date_bounds() if rows else (None, None)
+    return {"path": path, "rows": rows, "apps": apps, "first_date": first_date, "last_date": last_date,
+            "size": log_size(path)}
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+# Calendar buckets for bar charts, finest first: (period, days per bucket, label format)
+BAR_RESOLUTIONS = [
+    (None, 1, "%d %b"),
+    ("W", 7, "Week of %d %b"),
+    ("M", 31, "%b %Y"),
+    ("Y", 366, "%Y"),
+]
+
+
+def max_points_for(chart_width, pixels_per_point):
+    return max(3, int(chart_width // pixels_per_point))
+
+
+def bucket_totals(totals, max_points):
+    """Sum a per-day series into the finest calendar buckets that fit in ``max_points`` bars.
+
+    Returns a frame with ``start`` (bucket start), ``label`` and ``value``.
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(pd.Index(totals.index)))
+    values = pd.Series(totals.to_numpy(), index=index)
+    span = (index.max() - index.min()).days + 1 if len(index) else 0
+    for period, days, label in BAR_RESOLUTIONS:
+        if span <= days * max_points:
+            break
+    if period is not None:
+        values = values.groupby(index.to_period(period)).sum()
+        values.index = values.index.start_time
+    return pd.DataFrame({"start": values.index, "label": values.index.strftime(label), "value": values.to_numpy()})
+
+
+def lttb(x, y, max_points):
+    """Largest-Triangle-Three-Buckets: positions of at most ``max_points`` points
+    that preserve the visual shape of the line through (x, y).
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    count = len(x)
+    if max_points >= count or max_points < 3:
+        return np.arange(count)
+
+    selected = np.empty(max_points, dtype="int64")
+    selected[0], selected[-1] = 0, count - 1
+    # The first and last points are kept; the rest is split into max_points - 2 buckets
+    edges = np.linspace(1, count - 1, max_points - 1).astype("int64")
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else count
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
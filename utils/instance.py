@@ -1,10 +1,34 @@
+import importlib
+import threading
 import streamlit as st
 from chatbot.usage_data_rag import UsageDataRAG
 
+# What the vector store and LLM pull in; none of it is imported until a
+# general question (or the warm-up) needs it
+CHATBOT_MODULES = ["sentence_transformers", "chromadb", "langchain.schema", "langchain.prompts", "langchain_ollama"]
 
+
+@st.cache_resource
 def get_rag_instance():
-    # Session state
-    if 'rag_instance' not in st.session_state:
-        st.session_state.rag_instance = UsageDataRAG()
-    return st.session_state.rag_instance
+    # One engine for every session; each session only keeps its chat history
+    return UsageDataRAG()
+
+
+def _import_chatbot_modules():
+    for name in CHATBOT_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"⚠️ Chatbot warm-up skipped {name}: {e}")
+
+
+@st.cache_resource
+def warm_up_chatbot():
+    """Import the chatbot stack in a background thread, once per process.
 
+    The first AI Chat answer then skips the multi-second torch and LangChain
+    imports, while the dashboard renders without waiting for them.
+    """
+    thread = threading.Thread(target=_import_chatbot_modules, name="chatbot-warm-up", daemon=True)
+    thread.start()
+    return thread